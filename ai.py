@@ -11,8 +11,12 @@ Basic usage:
 from functionality import MinesweeperFunctions
 from linalg import LinearAlgebraAlgorithm
 from recursive import RecursiveAlgorithm
+import collections
 import copy
+import cProfile
+import random
 import time
+import numpy as np
 from game import *
 import linalg
 
@@ -22,6 +26,7 @@ Public members:
 RESULT_CODE
 __init__(options=None)
 getData()
+getColumns()
 solve(game)
 """
 class Solver(MinesweeperFunctions):
@@ -47,14 +52,43 @@ class Solver(MinesweeperFunctions):
 		'DONE': 5,
 	}
 
+	__DATA_CODE = {
+		'FULL': 0,
+		'SUMMARY': 1,
+	}
+
 	__PRINT_MODE = __PRINT_CODE['DOTS']
+	__DATA_MODE = __DATA_CODE['FULL']
+	__TIMING = False
+	__PROFILE = None
 	__DELAY = 0
 	__AI_STATE = __STATE_CODE['INITIALIZED']
 	__GUESS = False
+	__SEED = None
+	# A render.ConsoleRenderer to show the board with in the 'BOARD' print mode
+	__RENDERER = None
+
+	# Everything below is set up again in __init__, so that every solver owns its state
+	# and its random stream and several solvers can run side by side in threads
+
+	# Random stream used for guessing
+	__RANDOM = None
+
+	# Covered cells that touch at least one opened cell, kept up to date between loops
+	__FRONTIER = None
+
+	# Verdicts of the flag and open tests for each candidate, kept across the loops of one solve
+	# Each verdict is dropped when any cell that its tests looked at changes, and only
+	# the most recently used __CACHE_SIZE of them are kept
+	__CACHE_SIZE = 4096
+	__VERDICTS = None
+	# For each cell, the candidates whose verdicts depend on it. Every verdict keeps its
+	# own 'REGION', so it is taken out of here whenever it is dropped
+	__DEPENDENTS = None
 
 	# Solvers
-	__RECURSIVE_SOLVER = RecursiveAlgorithm()
-	__LINEAR_ALGEBRA_SOLVER = LinearAlgebraAlgorithm()
+	__RECURSIVE_SOLVER = None
+	__LINEAR_ALGEBRA_SOLVER = None
 
 	__DATA_START = {
 		'GAME': {
@@ -68,8 +102,30 @@ class Solver(MinesweeperFunctions):
 				'NUMERICAL': [], # 0s, 1s, 2s, ..., and 8s
 			},
 			'OPENING': [], # For each element, store the size of the opening (a cluster of empty cells)
+			'LOOP_COUNT': 0, # number of entries in 'LOOP', even when only the last one is kept
 		},
 		'LOOP': [], 
+		'CACHE': {
+			'HITS': 0,
+			'MISSES': 0,
+			'INVALIDATED': 0,
+			'EVICTED': 0,
+		},
+		# Seconds spent in each phase of the loop and in each algorithm (only with the TIMING option)
+		# The algorithms run during the search phase, so their time is part of 'SEARCH'
+		'TIMING': {
+			'SEARCH': 0.0,
+			'WORK': 0.0,
+			'STATE_CHECK': 0.0,
+			'RECURSIVE': 0.0,
+			'LINEAR_ALGEBRA': 0.0,
+		},
+		'COUNTERS': {
+			'CANDIDATES': 0, # candidates given to the flag and open tests (including cached verdicts)
+			'RECURSION_STEPS': 0, # constraint checks made by the recursive algorithm
+			'GROUPS': 0, # independent groups counted by the linear algebra algorithm
+			'STATES': 0, # partial assignments (open constraint sums) those counts went through
+		},
 	}
 	"""
 	example below; the first entry will be the state of the game before the first loop
@@ -80,11 +136,35 @@ class Solver(MinesweeperFunctions):
 			'NUMBER_OPENED': 0,
 			'NUMBER_FLAGGED': 0,
 			'STILL_COVERED': 0,
+			'STILL_FLAGGED': 0,
 		}, 
 	],
 	"""
 
-	__DATA = copy.deepcopy(__DATA_START)
+	__DATA = None
+
+	# The loop information is kept in one numpy column per key, so that adding a loop
+	# only writes a few numbers. getData() turns them into the 'LOOP' list above
+	# With the 'SUMMARY' data mode only the last loop is kept
+	__LOOP_COLUMNS = {
+		'BOMBS_LEFT': np.int32,
+		'TIME_ELAPSED': np.float64,
+		'NUMBER_OPENED': np.int32,
+		'NUMBER_FLAGGED': np.int32,
+		'STILL_COVERED': np.int32,
+		'STILL_FLAGGED': np.int32,
+	}
+	# With the TIMING option, every loop also gets the time of each phase and algorithm
+	# ('SEARCH_TIME', ...) and how much each counter went up ('CANDIDATES', ...)
+	__COLUMNS = None
+	__LOOPS = None
+	__LOOP_COUNT = 0
+	# Times and counters of the current loop
+	__LOOP_TIMES = None
+	__LOOP_COUNTERS = None
+	# Counts of covered and flagged cells, updated from the changes of every loop
+	__COVERED = 0
+	__FLAGGED = 0
 
 	def __init__(self, options=None):
 		super().__init__('status_off')
@@ -96,11 +176,53 @@ class Solver(MinesweeperFunctions):
 				self.__DELAY = options['DELAY']
 			if 'GUESS' in options:
 				self.__GUESS = options['GUESS']
+			if 'CACHE_SIZE' in options:
+				self.__CACHE_SIZE = options['CACHE_SIZE']
+			if 'SEED' in options:
+				self.__SEED = options['SEED']
+			if 'DATA_MODE' in options:
+				self.__DATA_MODE = self.__DATA_CODE[options['DATA_MODE']]
+			if 'TIMING' in options:
+				self.__TIMING = options['TIMING']
+			if 'PROFILE' in options:
+				self.__PROFILE = options['PROFILE']
+			if 'RENDERER' in options:
+				self.__RENDERER = options['RENDERER']
+
+		self.__AI_STATE = self.__STATE_CODE['INITIALIZED']
+		self.__RANDOM = random.Random(self.__SEED)
+		self.__FRONTIER = set()
+		self.__resetVerdicts()
+		self.__RECURSIVE_SOLVER = RecursiveAlgorithm()
+		self.__LINEAR_ALGEBRA_SOLVER = LinearAlgebraAlgorithm()
+		self.__DATA = copy.deepcopy(self.__DATA_START)
 
-	def getData(self):
-		return self.__DATA
+		self.__COLUMNS = dict(self.__LOOP_COLUMNS)
+		if self.__TIMING:
+			self.__COLUMNS.update({key + '_TIME': np.float64 for key in self.__DATA_START['TIMING']})
+			self.__COLUMNS.update({key: np.int64 for key in self.__DATA_START['COUNTERS']})
 
-	def __setupDataCollection(self, game):
+	def getData(self):
+		data = dict(self.__DATA)
+		data['LOOP'] = self.__getLoops()
+		return data
+
+	# Returns the numpy columns of the loop information, trimmed to the loops kept
+	def getColumns(self):
+		if self.__LOOPS is None:
+			return {key: np.zeros(0, dtype=dtype) for key, dtype in self.__COLUMNS.items()}
+		kept = min(self.__LOOP_COUNT, len(self.__LOOPS['BOMBS_LEFT']))
+		return {key: column[:kept] for key, column in self.__LOOPS.items()}
+
+	def __getLoops(self):
+		columns = self.getColumns()
+		loops = [{key: column[i].item() for key, column in columns.items()} 
+			for i in range(len(columns['BOMBS_LEFT']))]
+		for i in range(len(loops)):
+			loops[i]['TIME_ELAPSED'] = '{0:.2f}'.format(columns['TIME_ELAPSED'][i])
+		return loops
+
+	def __setupDataCollection(self, game, turn):
 		self.__DATA = copy.deepcopy(self.__DATA_START)
 		self.__DATA['GAME']['RESULT'] = self.RESULT_CODE['N/A']
 		self.__DATA['GAME']['CELL_COUNT']['HEIGHT'] = game.getBoardHeight()
@@ -108,19 +230,76 @@ class Solver(MinesweeperFunctions):
 		self.__DATA['GAME']['CELL_COUNT']['TOTAL'] = game.getBoardHeight() * game.getBoardWidth()
 		self.__DATA['GAME']['CELL_COUNT']['BOMBS'] = game.getTotalBombs()
 
-	def __updateDataLoop(self, index, turn, flagged=None, opened=None):
-		self.__DATA['LOOP'].append({})
-		self.__DATA['LOOP'][index]['BOMBS_LEFT'] = turn['BOMBS']
-		self.__DATA['LOOP'][index]['TIME_ELAPSED'] = '{0:.2f}'.format(turn['TIME'])
-		self.__DATA['LOOP'][index]['NUMBER_FLAGGED'] = 0 if flagged is None else flagged
-		self.__DATA['LOOP'][index]['NUMBER_OPENED'] = 0 if opened is None else opened
-		all_cells = [(x, y)
-			for x in range(len(turn['BOARD'])) 
-			for y in range(len(turn['BOARD'][x]))]
-		self.__DATA['LOOP'][index]['STILL_COVERED'] = len(self._filterCells(turn['BOARD'], all_cells, code='COVERED'))
-
-	def __stateCheckPhase(self, previousTurn, thisTurn):
-		if previousTurn['BOARD'] == thisTurn['BOARD']:
+		size = 64 if self.__DATA_MODE == self.__DATA_CODE['FULL'] else 1
+		self.__LOOPS = {key: np.zeros(size, dtype=dtype) for key, dtype in self.__COLUMNS.items()}
+		self.__LOOP_COUNT = 0
+		self.__LOOP_TIMES = dict.fromkeys(self.__DATA['TIMING'], 0.0)
+		self.__LOOP_COUNTERS = dict(self.__DATA['COUNTERS'])
+		self.__RECURSIVE_SOLVER.resetCounters()
+		self.__LINEAR_ALGEBRA_SOLVER.resetCounters()
+
+		# The only full count of the board; from here on the counts follow the changes
+		self.__COVERED = sum(row.count(self._CODES['COVERED']) for row in turn['BOARD'])
+		self.__FLAGGED = sum(row.count(self._CODES['FLAGGED']) for row in turn['BOARD'])
+
+	# Keeps the covered and flagged counts up to date
+	# Expects the board to not include the changes yet
+	def __countChanges(self, board, changes):
+		for x, y, code in changes:
+			old = board[x][y]
+			if old == self._CODES['COVERED']:
+				self.__COVERED = self.__COVERED - 1
+			elif old == self._CODES['FLAGGED']:
+				self.__FLAGGED = self.__FLAGGED - 1
+			if code == self._CODES['COVERED']:
+				self.__COVERED = self.__COVERED + 1
+			elif code == self._CODES['FLAGGED']:
+				self.__FLAGGED = self.__FLAGGED + 1
+
+	def __updateDataLoop(self, turn, flagged=None, opened=None):
+		size = len(self.__LOOPS['BOMBS_LEFT'])
+		if self.__DATA_MODE == self.__DATA_CODE['SUMMARY']:
+			index = 0
+		else:
+			index = self.__LOOP_COUNT
+			if index == size:
+				for key in self.__LOOPS:
+					self.__LOOPS[key] = np.concatenate([self.__LOOPS[key], np.zeros_like(self.__LOOPS[key])])
+
+		self.__LOOPS['BOMBS_LEFT'][index] = turn['BOMBS']
+		self.__LOOPS['TIME_ELAPSED'][index] = turn['TIME']
+		self.__LOOPS['NUMBER_FLAGGED'][index] = 0 if flagged is None else flagged
+		self.__LOOPS['NUMBER_OPENED'][index] = 0 if opened is None else opened
+		self.__LOOPS['STILL_COVERED'][index] = self.__COVERED
+		self.__LOOPS['STILL_FLAGGED'][index] = self.__FLAGGED
+		self.__LOOP_COUNT = self.__LOOP_COUNT + 1
+		self.__DATA['GAME']['LOOP_COUNT'] = self.__LOOP_COUNT
+
+		counters = self.__DATA['COUNTERS']
+		counters.update(self.__RECURSIVE_SOLVER.getCounters())
+		counters.update(self.__LINEAR_ALGEBRA_SOLVER.getCounters())
+		if self.__TIMING:
+			for key in self.__LOOP_TIMES:
+				self.__LOOPS[key + '_TIME'][index] = self.__LOOP_TIMES[key]
+				self.__LOOP_TIMES[key] = 0.0
+			for key in counters:
+				self.__LOOPS[key][index] = counters[key] - self.__LOOP_COUNTERS[key]
+				self.__LOOP_COUNTERS[key] = counters[key]
+
+	# Returns the time to pass to __stopTimer later, when the TIMING option is on
+	def __startTimer(self):
+		return time.perf_counter() if self.__TIMING else 0.0
+
+	# Adds the time since start to the given phase or algorithm
+	def __stopTimer(self, key, start):
+		if self.__TIMING:
+			elapsed = time.perf_counter() - start
+			self.__LOOP_TIMES[key] = self.__LOOP_TIMES[key] + elapsed
+			self.__DATA['TIMING'][key] = self.__DATA['TIMING'][key] + elapsed
+
+	# Takes the list of cells that changed during this loop
+	def __stateCheckPhase(self, changes):
+		if len(changes) == 0:
 			# if self.__AI_STATE == self.__STATE_CODE['NORMAL']:
 				# self.__AI_STATE = self.__STATE_CODE['WARNING']
 			# elif self.__AI_STATE == self.__STATE_CODE['WARNING']:
@@ -138,6 +317,91 @@ class Solver(MinesweeperFunctions):
 		elif self.__AI_STATE != self.__STATE_CODE['NORMAL'] and self.__AI_STATE != self.__STATE_CODE['DONE']:
 			self.__AI_STATE = self.__STATE_CODE['NORMAL']
 
+	# Updates the frontier using only the cells that changed and their neighbors
+	# Expects the board to already include the changes
+	def __updateFrontier(self, board, changes):
+		for x, y, code in changes:
+			if code == self._CODES['COVERED']:
+				# An unflagged cell is on the frontier again if it touches an opened cell
+				for n in self._getAllNeighbors(board, (x, y)):
+					value = board[n[0]][n[1]]
+					if value != self._CODES['COVERED'] and value != self._CODES['FLAGGED']:
+						self.__FRONTIER.add((x, y))
+						break
+			else:
+				self.__FRONTIER.discard((x, y))
+				if code != self._CODES['FLAGGED']:
+					# A newly opened cell brings its covered neighbors onto the frontier
+					for n in self._getAllNeighbors(board, (x, y)):
+						if board[n[0]][n[1]] == self._CODES['COVERED']:
+							self.__FRONTIER.add(n)
+
+	def __resetVerdicts(self):
+		self.__VERDICTS = collections.OrderedDict()
+		self.__DEPENDENTS = {}
+
+	# A verdict stays correct as long as the cells it looked at have not changed,
+	# and the number of bombs left is still compatible with it: a test that succeeded
+	# needs at least as many bombs as it flagged, and a test that failed keeps failing
+	# when there are fewer bombs left
+	def __isVerdictValid(self, verdict, bombs):
+		if bombs == verdict['BOMBS']:
+			return True
+		for result in (verdict['FLAG'], verdict['OPEN']):
+			if result is False:
+				if bombs > verdict['BOMBS']:
+					return False
+			elif bombs < len(result[1]):
+				return False
+		return True
+
+	# Returns the results of (canIFlagThis, canIOpenThis) for the candidate, 
+	# reusing the verdict from an earlier loop when it is still valid
+	def __getVerdict(self, board, bombs, cell):
+		self.__DATA['COUNTERS']['CANDIDATES'] = self.__DATA['COUNTERS']['CANDIDATES'] + 1
+		verdict = self.__VERDICTS.get(cell)
+		if verdict is not None and self.__isVerdictValid(verdict, bombs):
+			self.__VERDICTS.move_to_end(cell)
+			self.__DATA['CACHE']['HITS'] = self.__DATA['CACHE']['HITS'] + 1
+			return (verdict['FLAG'], verdict['OPEN'])
+		self.__DATA['CACHE']['MISSES'] = self.__DATA['CACHE']['MISSES'] + 1
+
+		region = set()
+		start = self.__startTimer()
+		canFlag = self.__RECURSIVE_SOLVER.canIFlagThis(board, bombs, cell, region=region)
+		canOpen = self.__RECURSIVE_SOLVER.canIOpenThis(board, bombs, cell, region=region)
+		self.__stopTimer('RECURSIVE', start)
+
+		self.__dropVerdict(cell)
+		self.__VERDICTS[cell] = {'FLAG': canFlag, 'OPEN': canOpen, 'BOMBS': bombs, 'REGION': region}
+		for r in region:
+			self.__DEPENDENTS.setdefault(r, set()).add(cell)
+
+		if len(self.__VERDICTS) > self.__CACHE_SIZE:
+			self.__dropVerdict(next(iter(self.__VERDICTS)))
+			self.__DATA['CACHE']['EVICTED'] = self.__DATA['CACHE']['EVICTED'] + 1
+
+		return (canFlag, canOpen)
+
+	# Removes the verdict of the candidate, if any, along with its entries in __DEPENDENTS
+	def __dropVerdict(self, cell):
+		verdict = self.__VERDICTS.pop(cell, None)
+		if verdict is None:
+			return
+		for r in verdict['REGION']:
+			dependents = self.__DEPENDENTS.get(r)
+			if dependents is not None:
+				dependents.discard(cell)
+				if len(dependents) == 0:
+					del self.__DEPENDENTS[r]
+
+	# Drops every verdict that depends on one of the changed cells
+	def __invalidateVerdicts(self, changes):
+		for x, y, code in changes:
+			for cell in list(self.__DEPENDENTS.get((x, y), ())):
+				self.__dropVerdict(cell)
+				self.__DATA['CACHE']['INVALIDATED'] = self.__DATA['CACHE']['INVALIDATED'] + 1
+
 	def __searchPhase(self, thisTurn):
 		# Depending on the game mode, add certain cells to these arrays
 		toOpen = []
@@ -145,11 +409,7 @@ class Solver(MinesweeperFunctions):
 
 		if self.__AI_STATE == self.__STATE_CODE['NORMAL']:
 			# Candidates for modification are any covered cells neighboring opened cells
-			candidates = [(x, y)
-				for x in range(len(thisTurn['BOARD'])) 
-				for y in range(len(thisTurn['BOARD'][x]))
-				if thisTurn['BOARD'][x][y] == self._CODES['COVERED'] 
-				and len(self._getNeighbors(thisTurn['BOARD'], (x, y), code='REALLY_OPENED')) > 0]
+			candidates = sorted(self.__FRONTIER)
 
 			for c in candidates:
 				# For efficiency, check that the candidate has not been solved yet
@@ -158,8 +418,7 @@ class Solver(MinesweeperFunctions):
 					# If it is possible to do this move, canFlag is a list of two lists:
 					#   canFlag[0] is a list of cells that would be opened according to game logic
 					#   canFlag[1] is a list of cells that would be flagged according to game logic
-					canFlag = self.__RECURSIVE_SOLVER.canIFlagThis(thisTurn['BOARD'], thisTurn['BOMBS'], c)
-					canOpen = self.__RECURSIVE_SOLVER.canIOpenThis(thisTurn['BOARD'], thisTurn['BOMBS'], c)
+					canFlag, canOpen = self.__getVerdict(thisTurn['BOARD'], thisTurn['BOMBS'], c)
 
 					if canFlag and canOpen:
 						# Even though there is not clear evidence to open or flag the candidate,
@@ -180,7 +439,9 @@ class Solver(MinesweeperFunctions):
 		elif self.__AI_STATE == self.__STATE_CODE['WARNING']:
 			xx = 0
 			print('WARNING!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+			start = self.__startTimer()
 			toOpen, toFlag = self.__LINEAR_ALGEBRA_SOLVER.solution(self, thisTurn)
+			self.__stopTimer('LINEAR_ALGEBRA', start)
 
 
 		elif self.__AI_STATE == self.__STATE_CODE['GUESS'] and self.__GUESS == True:
@@ -189,27 +450,57 @@ class Solver(MinesweeperFunctions):
 				for y in range(len(thisTurn['BOARD'][x]))]
 			covered_cells = self._filterCells(thisTurn['BOARD'], all_cells, 'COVERED')
 
-			toOpen.append(covered_cells[random.randrange(len(covered_cells))])
+			# Open one of the covered cells least likely to be a bomb, picking randomly among ties.
+			# Falls back to any covered cell if the board has no consistent arrangement
+			start = self.__startTimer()
+			probabilities = self.__LINEAR_ALGEBRA_SOLVER.getProbabilities(thisTurn['BOARD'], thisTurn['BOMBS'])
+			self.__stopTimer('LINEAR_ALGEBRA', start)
+			if len(probabilities) > 0:
+				lowest = min(probabilities.values())
+				covered_cells = sorted(c for c in probabilities if probabilities[c] == lowest)
+
+			toOpen.append(covered_cells[self.__RANDOM.randrange(len(covered_cells))])
 
 		return (list(set(toOpen)), list(set(toFlag)))
 
 	"""
 	Expects an already-started game (unless guessing is turned on)
+	With the PROFILE option set to a file path, the solve runs under cProfile
+	and the stats are saved to that file (readable with pstats)
 	"""
 	def solve(self, game):
+		if self.__PROFILE is None:
+			return self.__solve(game)
+
+		profiler = cProfile.Profile()
+		profiler.enable()
+		try:
+			return self.__solve(game)
+		finally:
+			profiler.disable()
+			profiler.dump_stats(self.__PROFILE)
+
+	def __solve(self, game):
 		# Information to keep track within the loops
 		self.__AI_STATE = self.__STATE_CODE['NORMAL']
-		previousTurn = game.getGameVisible()
 		thisTurn = game.getGameVisible()
+		version = game.getVersion()
+		self.__FRONTIER = set(self._getFrontier(thisTurn['BOARD'])['FRONTIER'])
+		self.__resetVerdicts()
 
 		# Set up data collection and add first loop information
 		loop_count = 0
-		self.__setupDataCollection(game)
-		self.__updateDataLoop(loop_count, thisTurn)
+		self.__setupDataCollection(game, thisTurn)
+		self.__updateDataLoop(thisTurn)
 
 		if self.__PRINT_MODE != self.__PRINT_CODE['NOTHING']:
 			print('\nVisible: ')
-			game.consoleDisplayVisible()
+			if self.__RENDERER is None:
+				game.consoleDisplayVisible()
+			else:
+				# The game may have been drawn by another solve with a change log since started over
+				self.__RENDERER.invalidate()
+				self.__RENDERER.render(game, force=True)
 			print('')
 			print('')
 			print('STARTING SOLUTION LOOP')
@@ -221,10 +512,13 @@ class Solver(MinesweeperFunctions):
 			loop_count = loop_count + 1
 
 			### SEARCH PHASE
+			start = self.__startTimer()
 			toOpen, toFlag = self.__searchPhase(thisTurn)
+			self.__stopTimer('SEARCH', start)
 
 			### WORK PHASE
 			# Open and flag the cells that were determined in the search phase
+			start = self.__startTimer()
 			countOpened = 0
 			countFlagged = 0
 
@@ -245,40 +539,56 @@ class Solver(MinesweeperFunctions):
 				if self.__AI_STATE == self.__STATE_CODE['DONE']:
 					break
 
+			self.__stopTimer('WORK', start)
+
 			### STATE CHECK PHASE
+			# Bring our copy of the board up to date with only the cells that changed
+			start = self.__startTimer()
+			changes = game.getChangesSince(version)
+			version = game.getVersion()
+			self.__countChanges(thisTurn['BOARD'], changes)
+			for x, y, code in changes:
+				thisTurn['BOARD'][x][y] = code
+			self.__updateFrontier(thisTurn['BOARD'], changes)
+			self.__invalidateVerdicts(changes)
+			thisTurn['BOMBS'] = game.getBombsLeft()
+			thisTurn['TIME'] = game.getTimeElapsed()
+
 			# Start the decision process to see if we need to elevate the level of solving
-			previousTurn = copy.deepcopy(thisTurn)
-			thisTurn = game.getGameVisible()
-			self.__stateCheckPhase(previousTurn, thisTurn)
+			self.__stateCheckPhase(changes)
+			self.__stopTimer('STATE_CHECK', start)
 
 			### END OF LOOP PHASE
 			# Add data to data collection and print information to console
-			self.__updateDataLoop(loop_count, thisTurn, flagged=countFlagged, opened=countOpened)
+			self.__updateDataLoop(thisTurn, flagged=countFlagged, opened=countOpened)
 
 			if self.__PRINT_MODE == self.__PRINT_CODE['DOTS']:
 				print('.')
 			elif self.__PRINT_MODE == self.__PRINT_CODE['BOARD']:
-				game.consoleDisplayVisible()
+				if self.__RENDERER is None:
+					game.consoleDisplayVisible()
+				else:
+					self.__RENDERER.render(game)
 
 		# Finish up solve function and return
 		if self.__PRINT_MODE != self.__PRINT_CODE['NOTHING']:
+			if self.__RENDERER is not None:
+				self.__RENDERER.flush()
 			print('')
 			if self.__PRINT_MODE == self.__PRINT_CODE['DOTS']:
 				game.consoleDisplayVisible()
 			print('DONE')
 
 		# Finish up data collection
-		solution = game.getGameSolution()
+		solution = game.getGameSolution()['BOARD']
 
 		# Count of each kind of cell content except bomb (0, 1, 2, etc.)
-		self.__DATA['GAME']['CELL_COUNT']['NUMERICAL'] = [self._countAllCells(solution['BOARD'], str(i)) for i in range(9)]
+		counts = collections.Counter(c for row in solution for c in row)
+		self.__DATA['GAME']['CELL_COUNT']['NUMERICAL'] = [counts[self._CODES[str(i)]] for i in range(9)]
 
 		# Count of bombs on the edge of the board (predicted more likely to end in giving up due to guessing)
-		edges = copy.deepcopy(solution['BOARD'])
-		edges = [edges[i] if (i == 0 or i == len(edges) - 1) else [edges[i][0], edges[i][len(edges[i]) - 1]]
-			for i in range(len(edges))]
-		# for i in range(1, len(edgesBoard) - 1):
-			# edgesBoard[i] = [edgesBoard[i][0], edgesBoard[i][len(edgesBoard[0]) - 1]]
-		self.__DATA['GAME']['CELL_COUNT']['BOMBS_AT_EDGES'] = self._countAllCells(edges, 'BOMB')
+		edges = solution[0] + solution[-1] if len(solution) > 1 else solution[0]
+		edges = edges + [solution[i][j] for i in range(1, len(solution) - 1) for j in {0, len(solution[i]) - 1}]
+		self.__DATA['GAME']['CELL_COUNT']['BOMBS_AT_EDGES'] = edges.count(self._CODES['BOMB'])
 
 		return game
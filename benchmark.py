@@ -0,0 +1,268 @@
+"""
+Basic usage:
+`python3 benchmark.py` # run every benchmark and print the timings
+`python3 benchmark.py --save baseline.json` # also keep the timings as a baseline
+`python3 benchmark.py --compare baseline.json` # compare against a saved baseline
+`python3 benchmark.py --filter solve` # only the benchmarks whose name contains 'solve'
+
+Every benchmark runs on fixed seeds, so two runs always time the same work
+Only the standard library and numpy are needed
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+from ai import Solver
+from game import Game
+from linalg import LinearAlgebraAlgorithm
+from recursive import RecursiveAlgorithm
+
+"""
+Public members:
+
+__init__(options=None)
+getNames()
+run()
+getResults()
+save(path)
+compare(path)
+"""
+class BenchmarkSuite:
+	# (start seed, game seed) of the games the solver gets stuck on, as in sample.solveOne
+	# The first one used to leave a group of 20 unknowns that took 17.8 seconds
+	__STUCK_SEEDS = [
+		(37845, 99116),
+		(7103, 62552),
+		(85173, 9357),
+		(76524, 88081),
+		(3, 3),
+	]
+	__SLOW_SEEDS = (37845, 99116)
+
+	# Number of games played (on seeds 0, 1, 2, ...) by each call of the solve benchmarks
+	__SOLVE_GAMES = {
+		'BEGINNER': 10,
+		'INTERMEDIATE': 5,
+		'EXPERT': 3,
+	}
+
+	# options
+	__REPEAT = 7
+	# Each repeat calls the benchmark enough times to take at least this many seconds
+	__MIN_TIME = 0.2
+	__FILTER = None
+	# A benchmark has regressed when its median is this many times the baseline's
+	__THRESHOLD = 1.10
+
+	__CASES = None
+	__RESULTS = None
+
+	def __init__(self, options=None):
+		if options is not None:
+			if 'REPEAT' in options:
+				self.__REPEAT = options['REPEAT']
+			if 'MIN_TIME' in options:
+				self.__MIN_TIME = options['MIN_TIME']
+			if 'FILTER' in options:
+				self.__FILTER = options['FILTER']
+			if 'THRESHOLD' in options:
+				self.__THRESHOLD = options['THRESHOLD']
+
+		self.__CASES = [c for c in self.__getCases()
+			if self.__FILTER is None or self.__FILTER in c[0]]
+		self.__RESULTS = {}
+
+	# Sets up a game with the same seeds and first click as sample.start_game
+	def __startGame(self, startSeed, gameSeed, level):
+		game = Game(options={'SILENT': True, 'SEED': gameSeed})
+		game.populateBoard(level=level)
+		start = random.Random(startSeed)
+		game.open(start.randrange(game.getBoardHeight()), start.randrange(game.getBoardWidth()))
+		return game
+
+	# Plays the given seeds without guessing and returns the visible boards the solver got stuck on
+	def __stuckBoards(self, seeds):
+		boards = []
+		for startSeed, gameSeed in seeds:
+			game = self.__startGame(startSeed, gameSeed, 'EXPERT')
+			Solver(options={'PRINT_MODE': 'NOTHING', 'GUESS': False, 'DATA_MODE': 'SUMMARY'}).solve(game)
+			boards.append(game.getGameVisible())
+		return boards
+
+	# Returns a list of (name, setup) where setup() prepares the inputs (untimed)
+	# and returns the function to be timed
+	def __getCases(self):
+		def recursive(test):
+			def setup():
+				algorithm = RecursiveAlgorithm()
+				boards = [(v['BOARD'], v['BOMBS'], algorithm._getFrontier(v['BOARD'])['FRONTIER'])
+					for v in self.__stuckBoards(self.__STUCK_SEEDS)]
+				method = getattr(algorithm, test)
+				def run():
+					for board, bombs, frontier in boards:
+						for cell in frontier:
+							method(board, bombs, cell)
+				return run
+			return setup
+
+		def frontier():
+			algorithm = LinearAlgebraAlgorithm()
+			boards = [v['BOARD'] for v in self.__stuckBoards(self.__STUCK_SEEDS)]
+			def run():
+				for board in boards:
+					algorithm._getFrontier(board)
+			return run
+
+		def probabilities(seeds):
+			def setup():
+				algorithm = LinearAlgebraAlgorithm()
+				boards = self.__stuckBoards(seeds)
+				def run():
+					for v in boards:
+						algorithm.getProbabilities(v['BOARD'], v['BOMBS'])
+				return run
+			return setup
+
+		def solve(level):
+			def setup():
+				def run():
+					for seed in range(self.__SOLVE_GAMES[level]):
+						game = self.__startGame(seed, seed, level)
+						Solver(options={'PRINT_MODE': 'NOTHING', 'GUESS': True, 'SEED': seed, 'DATA_MODE': 'SUMMARY'}).solve(game)
+				return run
+			return setup
+
+		return [
+			('recursive.canIFlagThis', recursive('canIFlagThis')),
+			('recursive.canIOpenThis', recursive('canIOpenThis')),
+			('linalg.frontier', frontier),
+			('linalg.probabilities', probabilities(self.__STUCK_SEEDS)),
+			('linalg.probabilities.slowGroup', probabilities([self.__SLOW_SEEDS])),
+			('solve.BEGINNER', solve('BEGINNER')),
+			('solve.INTERMEDIATE', solve('INTERMEDIATE')),
+			('solve.EXPERT', solve('EXPERT')),
+		]
+
+	def getNames(self):
+		return [c[0] for c in self.__CASES]
+
+	# Times one benchmark: finds how many calls take at least __MIN_TIME,
+	# then times that many calls __REPEAT times. Times are per call, in seconds
+	def __time(self, run):
+		number = 1
+		while True:
+			start = time.perf_counter()
+			for i in range(number):
+				run()
+			elapsed = time.perf_counter() - start
+			if elapsed >= self.__MIN_TIME or number >= 1 << 20:
+				break
+			number = number * 2
+
+		samples = []
+		for r in range(self.__REPEAT):
+			start = time.perf_counter()
+			for i in range(number):
+				run()
+			samples.append((time.perf_counter() - start) / number)
+
+		return {
+			'NUMBER': number,
+			'REPEAT': self.__REPEAT,
+			'MIN': min(samples),
+			'MEDIAN': statistics.median(samples),
+			'MEAN': statistics.mean(samples),
+			'STDEV': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+			'MAX': max(samples),
+		}
+
+	# Runs every benchmark and prints one line for each
+	def run(self):
+		print('{0:<34} {1:>12} {2:>12} {3:>12} {4:>8}'.format('benchmark', 'min', 'median', 'max', 'calls'))
+		for name, setup in self.__CASES:
+			# The solver and the linear algebra algorithm print as they go
+			with contextlib.redirect_stdout(io.StringIO()):
+				result = self.__time(setup())
+			self.__RESULTS[name] = result
+			print('{0:<34} {1:>12} {2:>12} {3:>12} {4:>8}'.format(name,
+				self.__formatTime(result['MIN']), self.__formatTime(result['MEDIAN']),
+				self.__formatTime(result['MAX']), result['NUMBER'] * result['REPEAT']))
+		return self.__RESULTS
+
+	def __formatTime(self, seconds):
+		for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+			if seconds >= scale:
+				return '{0:.3f} {1}'.format(seconds / scale, unit)
+		return '{0:.3f} ns'.format(seconds / 1e-9)
+
+	def getResults(self):
+		return self.__RESULTS
+
+	def save(self, path):
+		baseline = {
+			'PYTHON': platform.python_version(),
+			'NUMPY': np.__version__,
+			'MACHINE': platform.machine(),
+			'CASES': self.__RESULTS,
+		}
+		with open(path, 'w') as f:
+			json.dump(baseline, f, indent='\t', sort_keys=True)
+
+	# Compares the medians against a saved baseline and prints the ratio for every benchmark
+	# Returns the names of the benchmarks that got slower than the threshold allows
+	def compare(self, path):
+		with open(path) as f:
+			baseline = json.load(f)['CASES']
+
+		regressions = []
+		print('')
+		print('{0:<34} {1:>12} {2:>12} {3:>8}'.format('benchmark', 'baseline', 'now', 'ratio'))
+		for name, result in self.__RESULTS.items():
+			if name not in baseline:
+				print('{0:<34} {1:>12} {2:>12} {3:>8}'.format(name, '-', self.__formatTime(result['MEDIAN']), '-'))
+				continue
+
+			ratio = result['MEDIAN'] / baseline[name]['MEDIAN']
+			mark = ''
+			if ratio > self.__THRESHOLD:
+				regressions.append(name)
+				mark = ' slower'
+			elif ratio < 1 / self.__THRESHOLD:
+				mark = ' faster'
+			print('{0:<34} {1:>12} {2:>12} {3:>8}{4}'.format(name, self.__formatTime(baseline[name]['MEDIAN']),
+				self.__formatTime(result['MEDIAN']), '{0:.2f}x'.format(ratio), mark))
+		return regressions
+
+if __name__=='__main__':
+	parser = argparse.ArgumentParser(description='Times the solver hot paths on fixed seeds.')
+	parser.add_argument('--save', help='write the timings to this JSON file')
+	parser.add_argument('--compare', help='compare the timings against this JSON file')
+	parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+	parser.add_argument('--repeat', type=int, default=7, help='number of timed repeats per benchmark')
+	parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per repeat')
+	parser.add_argument('--threshold', type=float, default=1.10, help='median ratio that counts as a regression')
+	args = parser.parse_args()
+
+	suite = BenchmarkSuite(options={
+		'REPEAT': args.repeat,
+		'MIN_TIME': args.min_time,
+		'FILTER': args.filter,
+		'THRESHOLD': args.threshold,
+	})
+	suite.run()
+
+	if args.save is not None:
+		suite.save(args.save)
+	if args.compare is not None:
+		regressions = suite.compare(args.compare)
+		if len(regressions) > 0:
+			print('')
+			print('Slower than the baseline: {}'.format(', '.join(regressions)))
+			sys.exit(1)
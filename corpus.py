@@ -0,0 +1,150 @@
+"""
+Basic usage:
+`python3`
+`from corpus import *`
+`corpus = BoardCorpus('expert.corpus', options={'HEIGHT': 16, 'WIDTH': 30})`
+`corpus.appendContents(*BoardFactory().makeContents(10000, level='EXPERT'))`
+`game, firstClick = corpus.getGame(1234)`
+"""
+
+import os
+import numpy as np
+from functionality import MinesweeperFunctions
+from game import Game
+
+"""
+Public members:
+
+__init__(path, options=None)
+getSize()
+getShape()
+append(game, click=None)
+appendContents(contents, clicks=None)
+getRecords()
+getGame(index, options=None)
+getContents(indices)
+"""
+# A file of games that all have the same board size, one fixed-size record per game,
+# so that any game can be read by its index straight from a memory map of the file
+# without parsing or loading the rest of it
+#
+# The file starts with a header (see __HEADER), followed by the records
+# Each record is the first click as two int32 (x, y), or (-1, -1) if there is none,
+# followed by the game as in Game.getRecordType
+class BoardCorpus(MinesweeperFunctions):
+	__MAGIC = b'MSCORPUS'
+	__VERSION = 2
+	__HEADER = np.dtype([
+		('MAGIC', 'S8'),
+		('VERSION', '<u4'),
+		('HEIGHT', '<u4'),
+		('WIDTH', '<u4'),
+		('RECORD_SIZE', '<u4'),
+	])
+
+	__BOMB = 9
+
+	# options
+	__HEIGHT = None
+	__WIDTH = None
+
+	__PATH = None
+	__RECORD = None
+	# Memory map of the records, opened again whenever the file has grown
+	__RECORDS = None
+
+	# Opens the corpus at path, creating it if it does not exist yet
+	# A new corpus needs the 'HEIGHT' and 'WIDTH' options; an existing one takes them from its header
+	def __init__(self, path, options=None):
+		super().__init__('status_off')
+		self.__PATH = path
+
+		if options is not None:
+			if 'HEIGHT' in options:
+				self.__HEIGHT = options['HEIGHT']
+			if 'WIDTH' in options:
+				self.__WIDTH = options['WIDTH']
+
+		if os.path.exists(path) and os.path.getsize(path) > 0:
+			header = np.fromfile(path, dtype=self.__HEADER, count=1)
+			if len(header) == 0 or header[0]['MAGIC'] != self.__MAGIC:
+				raise ValueError('Invalid corpus: {} was not made by BoardCorpus'.format(path))
+			if header[0]['VERSION'] != self.__VERSION:
+				raise ValueError('Invalid corpus: {} was made by version {} of BoardCorpus, not {}'.format(path, header[0]['VERSION'], self.__VERSION))
+			height = int(header[0]['HEIGHT'])
+			width = int(header[0]['WIDTH'])
+			if (self.__HEIGHT is not None and self.__HEIGHT != height) or (self.__WIDTH is not None and self.__WIDTH != width):
+				raise ValueError('Invalid options: {} holds boards of size {}x{}'.format(path, height, width))
+			self.__HEIGHT = height
+			self.__WIDTH = width
+			self.__RECORD = self.__recordType()
+		else:
+			if self.__HEIGHT is None or self.__WIDTH is None:
+				raise ValueError('A new corpus needs the HEIGHT and WIDTH options')
+			self.__RECORD = self.__recordType()
+			header = np.array([(self.__MAGIC, self.__VERSION, self.__HEIGHT, self.__WIDTH, self.__RECORD.itemsize)], dtype=self.__HEADER)
+			with open(path, 'wb') as f:
+				f.write(header.tobytes())
+
+	def __recordType(self):
+		return np.dtype([
+			('CLICK', '<i4', 2),
+			('GAME', Game.getRecordType(self.__HEIGHT, self.__WIDTH)),
+		])
+
+	def getSize(self):
+		return (os.path.getsize(self.__PATH) - self.__HEADER.itemsize) // self.__RECORD.itemsize
+
+	def getShape(self):
+		return (self.__HEIGHT, self.__WIDTH)
+
+	def __write(self, records):
+		with open(self.__PATH, 'ab') as f:
+			f.write(records.tobytes())
+
+	def append(self, game, click=None):
+		if (game.getBoardHeight(), game.getBoardWidth()) != self.getShape():
+			raise ValueError('Invalid game: the corpus holds boards of size {}x{}'.format(self.__HEIGHT, self.__WIDTH))
+		records = np.zeros(1, dtype=self.__RECORD)
+		records[0]['CLICK'] = (-1, -1) if click is None else click
+		records[0]['GAME'] = game.exportRecord()
+		self.__write(records)
+
+	# Adds many new (unopened) boards at once, such as those of BoardFactory.makeContents
+	# contents is an array of shape (n, height, width) as in Game.loadBoard
+	def appendContents(self, contents, clicks=None):
+		contents = np.asarray(contents)
+		if contents.shape[1:] != self.getShape():
+			raise ValueError('Invalid contents: the corpus holds boards of size {}x{}'.format(self.__HEIGHT, self.__WIDTH))
+
+		records = np.zeros(len(contents), dtype=self.__RECORD)
+		records['CLICK'] = -1 if clicks is None else clicks
+		records['GAME'] = Game.makeRecords(contents)
+		self.__write(records)
+
+	# Returns a read-only memory map of every record
+	def getRecords(self):
+		size = self.getSize()
+		if self.__RECORDS is None or len(self.__RECORDS) != size:
+			if size == 0:
+				return np.zeros(0, dtype=self.__RECORD)
+			self.__RECORDS = np.memmap(self.__PATH, dtype=self.__RECORD, mode='r', offset=self.__HEADER.itemsize, shape=(size,))
+		return self.__RECORDS
+
+	# Returns (game, (x, y)) for the game at index, with (x, y) its first click (or None)
+	# options are passed on to the Game, which is silent by default
+	def getGame(self, index, options=None):
+		record = self.getRecords()[index]
+		game = Game(options={'SILENT': True} if options is None else options)
+		game.importRecord(record['GAME'], self.__HEIGHT, self.__WIDTH)
+		click = tuple(record['CLICK'].tolist())
+		return (game, None if click == (-1, -1) else click)
+
+	# Returns (contents, clicks) for the boards at the given indices (an array, a list or a slice),
+	# with the contents computed for all of them at once, as in BoardFactory.makeContents
+	def getContents(self, indices):
+		records = self.getRecords()[indices]
+		cells = self.__HEIGHT * self.__WIDTH
+		bombs = np.unpackbits(records['GAME']['BOMBS'], axis=1, count=cells).reshape(len(records), self.__HEIGHT, self.__WIDTH)
+		contents = np.where(bombs, self.__BOMB, self._sumNeighbors(bombs)).astype(np.int8)
+		return (contents, np.array(records['CLICK'], dtype=np.int64))
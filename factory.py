@@ -0,0 +1,114 @@
+"""
+Basic usage:
+`python3`
+`from factory import *`
+`factory = BoardFactory(options={'SEED': 0})`
+`games = factory.makeGames(1000, level='EXPERT', start=True)`
+`game, firstClick = games[0]`
+"""
+
+import numpy as np
+from functionality import MinesweeperFunctions
+from game import Game
+
+"""
+Public members:
+
+__init__(options=None)
+getSize(level='BEGINNER', specs={})
+getZoneSize(height, width, firstClick=None)
+makeContents(howMany, level='BEGINNER', specs={}, firstClick=None)
+makeGames(howMany, level='BEGINNER', specs={}, firstClick=None, start=False)
+"""
+# Makes many boards at once with numpy instead of one Game.populateBoard at a time
+# The first click of every board is chosen up front, and bombs are only placed
+# outside of the 3x3 square around it, so opening there never has to move a bomb
+class BoardFactory(MinesweeperFunctions):
+	__BOMB = 9
+
+	# options
+	__SEED = None
+	# Options passed on to every Game made by makeGames
+	__GAME_OPTIONS = {'SILENT': True}
+
+	__RANDOM = None
+
+	def __init__(self, options=None):
+		super().__init__('status_off')
+
+		if options is not None:
+			if 'SEED' in options:
+				self.__SEED = options['SEED']
+			if 'GAME_OPTIONS' in options:
+				self.__GAME_OPTIONS = options['GAME_OPTIONS']
+
+		self.__RANDOM = np.random.default_rng(self.__SEED)
+
+	# Returns (height, width, bombs) for the same levels and specs as Game.populateBoard
+	def getSize(self, level='BEGINNER', specs={}):
+		if level not in Game.LEVEL_CODE:
+			raise ValueError('Invalid Level Code. Please choose one of \'BEGINNER\', \'INTERMEDIATE\', or \'EXPERT\'.')
+		h = specs['height'] if 'height' in specs else Game.LEVEL_CODE[level]['height']
+		w = specs['width'] if 'width' in specs else Game.LEVEL_CODE[level]['width']
+		b = specs['bombs'] if 'bombs' in specs else Game.LEVEL_CODE[level]['bombs']
+
+		if h <= 0 or w <= 0 or b >= h * w:
+			raise ValueError('Invalid parameters: can not make a board of size {}x{} with {} bombs'.format(h,w,b))
+		return h, w, b
+
+	# Returns the number of cells kept free of bombs around the first click: the 3x3 square
+	# around firstClick cut off at the edges, or without one, the largest such square,
+	# since a random first click may land anywhere
+	def getZoneSize(self, height, width, firstClick=None):
+		if firstClick is None:
+			return min(height, 3) * min(width, 3)
+		x, y = firstClick
+		return (min(x + 1, height - 1) - max(x - 1, 0) + 1) * (min(y + 1, width - 1) - max(y - 1, 0) + 1)
+
+	# Returns (contents, clicks): an int8 array of shape (howMany, height, width) with the
+	# contents of each board as in Game.loadBoard, and an array of shape (howMany, 2) with
+	# the first click of each board. firstClick (x, y) is used for every board if given,
+	# otherwise each board gets its own random first click
+	def makeContents(self, howMany, level='BEGINNER', specs={}, firstClick=None):
+		h, w, b = self.getSize(level, specs)
+
+		if firstClick is None:
+			clicks = np.stack([self.__RANDOM.integers(h, size=howMany), self.__RANDOM.integers(w, size=howMany)], axis=1)
+		else:
+			clicks = np.tile(np.array(firstClick, dtype=np.int64), (howMany, 1))
+
+		# The 3x3 square around each first click (cut off at the edges of the board)
+		rows = np.arange(h)
+		columns = np.arange(w)
+		zone = ((np.abs(rows[None, :, None] - clicks[:, 0, None, None]) <= 1)
+			& (np.abs(columns[None, None, :] - clicks[:, 1, None, None]) <= 1)).reshape(howMany, h * w)
+
+		if b > h * w - int(zone.sum(axis=1).max(initial=0)):
+			raise ValueError('Invalid parameters: can not fit {} bombs on a board of size {}x{} away from the first click'.format(b,h,w))
+
+		# Sampling without replacement: give every cell a random key, put the keys
+		# of the first click square out of reach, and take the b smallest keys
+		keys = self.__RANDOM.random((howMany, h * w))
+		keys[zone] = 2
+		bombs = np.zeros((howMany, h * w), dtype=bool)
+		if b > 0:
+			chosen = np.argpartition(keys, b - 1, axis=1)[:, :b]
+			np.put_along_axis(bombs, chosen, True, axis=1)
+		bombs = bombs.reshape(howMany, h, w)
+
+		contents = np.where(bombs, self.__BOMB, self._sumNeighbors(bombs)).astype(np.int8)
+		return (contents, clicks)
+
+	# Returns a list of (game, (x, y)) for howMany new games, ready to play, as made by
+	# makeContents, with (x, y) the first click. With start=True the first click of 
+	# every game is already opened (as in sample.start_game)
+	def makeGames(self, howMany, level='BEGINNER', specs={}, firstClick=None, start=False):
+		contents, clicks = self.makeContents(howMany, level, specs, firstClick)
+		seeds = self.__RANDOM.integers(100000, size=howMany).tolist()
+
+		games = []
+		for game, (x, y) in zip(Game.loadBoards(contents, self.__GAME_OPTIONS, seeds), clicks.tolist()):
+			if start:
+				game.open(x, y)
+			games.append((game, (x, y)))
+		return games
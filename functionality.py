@@ -1,3 +1,7 @@
+import collections
+import threading
+import numpy as np
+
 class MinesweeperFunctions:
 	_STATUS_CODE = {
 		'COVERED': '-',
@@ -24,6 +28,28 @@ class MinesweeperFunctions:
 
 	__MODE = None
 
+	# Number standing for each code of a visible board in _getFrontier: the value of a
+	# numbered cell, -1 for covered cells, -2 for flagged ones, and 0 for any other cell
+	__FRONTIER_VALUES = {i: i for i in range(1, 9)}
+	__FRONTIER_VALUES.update({_STATUS_CODE['COVERED']: -1, _STATUS_CODE['FLAGGED']: -2})
+
+	# Layout of the console display made by _formatBoard: the line of the time,
+	# the line of the bombs left, and the line of the first row of the board
+	_DISPLAY_TIME_LINE = 1
+	_DISPLAY_BOMBS_LINE = 2
+	_DISPLAY_BOARD_LINE = 5
+
+	# Neighbor lists are kept in one table per board shape, shared by every instance,
+	# so that looking up the neighbors of a cell does not rebuild them each time. 
+	# Only the most recently used shapes are kept around
+	__NEIGHBOR_TABLES = collections.OrderedDict()
+	__NEIGHBOR_TABLES_SIZE = 8
+	# The shared tables may be looked up from several threads at once
+	__NEIGHBOR_TABLES_LOCK = threading.Lock()
+	# The (shape, table) each instance used last, so that it only goes to the 
+	# shared tables (and takes the lock) when the board shape changes
+	__NEIGHBOR_TABLE = (None, None)
+
 	def __init__(self, mode):
 		if mode != 'status_on' and mode != 'status_off':
 			raise Exception('Must use the modes \'status_on\' or \'status_off\'')
@@ -50,41 +76,55 @@ class MinesweeperFunctions:
 		notOpened.extend(self._filterCells(board, cells, 'COVERED'))
 		notOpened.extend(self._filterCells(board, cells, 'FLAGGED'))
 		notOpened.extend(self._filterCells(board, cells, 'OPENED'))
+		notOpened = set(notOpened)
 		return [n for n in cells if n not in notOpened]
 
-	def _getAllNeighbors(self, board, cell):
+	# Returns the table of neighbor lists for a board of the given shape, indexed 
+	# by x * width + y. Entries start out as None and are filled in when first used
+	def __neighborTable(self, height, width):
+		key = (height, width)
+		last = self.__NEIGHBOR_TABLE
+		if last[0] == key:
+			return last[1]
+
+		with self.__NEIGHBOR_TABLES_LOCK:
+			table = self.__NEIGHBOR_TABLES.get(key)
+			if table is None:
+				table = [None] * (height * width)
+				self.__NEIGHBOR_TABLES[key] = table
+				if len(self.__NEIGHBOR_TABLES) > self.__NEIGHBOR_TABLES_SIZE:
+					self.__NEIGHBOR_TABLES.popitem(last=False)
+			else:
+				self.__NEIGHBOR_TABLES.move_to_end(key)
+
+		self.__NEIGHBOR_TABLE = (key, table)
+		return table
+
+	def __computeNeighbors(self, height, width, x, y):
 		# These ranges specify a square around the given cell, 
-		# so nine coordinates will be added to the list
-		x = cell[0]
-		y = cell[1]
-		coordinates = [(x + i, y + j)
+		# keeping only the coordinates that are on the board
+		# and leaving out the given cell itself
+		return tuple((x + i, y + j)
 			for i in range(-1,2)
-			for j in range(-1,2)]
-
-		# If the cell is at the top, bottom, left, or right sides
-		# of the board, then set the coordinates past the side 
-		# to None and later remove them from the return value
-		if x == 0:
-			coordinates[0] = None
-			coordinates[1] = None
-			coordinates[2] = None
-		if x == len(board) - 1:
-			coordinates[6] = None
-			coordinates[7] = None
-			coordinates[8] = None
-		if y == 0:
-			coordinates[0] = None
-			coordinates[3] = None
-			coordinates[6] = None
-		if y == len(board[0]) - 1:
-			coordinates[2] = None
-			coordinates[5] = None
-			coordinates[8] = None
-
-		# Set coordinates for the given cell to None
-		coordinates[4] = None
-		
-		return [c for c in coordinates if c is not None]
+			for j in range(-1,2)
+			if (i != 0 or j != 0) 
+			and 0 <= x + i < height 
+			and 0 <= y + j < width)
+
+	# Returns a tuple of the coordinates around the given cell. 
+	# The tuple is shared between calls, so it must not be modified
+	def _getAllNeighbors(self, board, cell):
+		height = len(board)
+		width = len(board[0])
+		x = int(cell[0])
+		y = int(cell[1])
+
+		table = self.__neighborTable(height, width)
+		neighbors = table[x * width + y]
+		if neighbors is None:
+			neighbors = self.__computeNeighbors(height, width, x, y)
+			table[x * width + y] = neighbors
+		return neighbors
 
 	def _getNeighbors(self, board, cell, code=None):
 		neighbors = self._getAllNeighbors(board, cell)
@@ -103,3 +143,87 @@ class MinesweeperFunctions:
 	def _countNeighbors(self, board, cell, code, status_on=None):
 		neighbors = self._getAllNeighbors(board, cell)
 		return len(self._filterCells(board, neighbors, code, status_on=status_on))
+
+	# Takes a 2D array of numbers and returns an array of the same shape where 
+	# every cell holds the sum of its (up to) eight neighbors. Done in one pass
+	# by adding up shifted views of a zero-padded copy of the grid
+	def _sumNeighbors(self, grid):
+		grid = np.asarray(grid)
+		h, w = grid.shape[-2:]
+		# Any leading axes are a stack of grids, each summed on its own
+		padded = np.zeros(grid.shape[:-2] + (h + 2, w + 2), dtype=np.int16)
+		padded[..., 1:h + 1, 1:w + 1] = grid
+
+		total = np.zeros(grid.shape[:-2] + (h, w), dtype=np.int16)
+		for i in range(3):
+			for j in range(3):
+				if i != 1 or j != 1:
+					total += padded[..., i:i + h, j:j + w]
+		return total
+
+	# Classifies every cell of a visible board (as used in 'status_off' mode)
+	# The board is turned into numbers in one pass over its cells, and the rest is done
+	# on whole arrays with numpy
+	# Returns a dict with:
+	#   'FRONTIER': covered cells touching at least one opened cell
+	#   'INTERIOR': covered cells not touching any opened cell
+	#   'CONSTRAINTS': opened cells touching at least one covered cell
+	#   'REMAINING': for each constraint cell, its value minus its flagged neighbors, 
+	#                i.e. how many bombs are still hidden among its covered neighbors
+	# All lists are in row-major order
+	def _getFrontier(self, board):
+		lookup = self.__FRONTIER_VALUES
+		grid = np.array([[lookup.get(c, 0) for c in row] for row in board], dtype=np.int16)
+		covered = grid == -1
+		flagged = grid == -2
+		opened = grid >= 0
+		values = np.maximum(grid, 0)
+
+		openedNeighbors, coveredNeighbors, flaggedNeighbors = self._sumNeighbors(np.stack([opened, covered, flagged]))
+
+		constraints = opened & (coveredNeighbors > 0)
+		return {
+			'FRONTIER': self.__listCells(covered & (openedNeighbors > 0)),
+			'INTERIOR': self.__listCells(covered & (openedNeighbors == 0)),
+			'CONSTRAINTS': self.__listCells(constraints),
+			'REMAINING': dict(zip(self.__listCells(constraints), (values - flaggedNeighbors)[constraints].tolist())),
+		}
+
+	# Returns the (x, y) of every True cell of a 2D mask, in row-major order
+	def __listCells(self, mask):
+		xs, ys = np.nonzero(mask)
+		return list(zip(xs.tolist(), ys.tolist()))
+
+	# Returns the lines of the console display of a board (rows of cell codes)
+	# Every line is built with a single join, and the cell (x, y) is found on line
+	# _DISPLAY_BOARD_LINE + x, at column _displayColumn(y, guides)
+	def _formatBoard(self, board, timeElapsed, bombsLeft, guides=True):
+		width = len(board[0])
+		lines = [
+			('/===' if guides else '/=') + '==' * width + '\\',
+			self._formatInfo('Time: {0:.2f}'.format(timeElapsed), width, guides),
+			self._formatInfo('Bombs left: {}'.format(bombsLeft), width, guides),
+			('|===' if guides else '|=') + '==' * width + '|',
+		]
+
+		# Column numbers or empty line
+		if guides:
+			lines.append('|   ' + ''.join('{} '.format(column % 10) for column in range(width)) + '|')
+		else:
+			lines.append('| ' + '  ' * width + '|')
+
+		# Row contents, with the row number before them
+		for row in range(len(board)):
+			start = '| {} '.format(row % 10) if guides else '| '
+			lines.append(start + ''.join('{} '.format(c) for c in board[row]) + '|')
+
+		lines.append(('|   ' if guides else '| ') + '  ' * width + '|')
+		lines.append(('\\===' if guides else '\\=') + '==' * width + '/')
+		return lines
+
+	# Returns the line of the console display holding the given message (the time or the bombs left)
+	def _formatInfo(self, message, width, guides=True):
+		return '| ' + message.ljust(2 * width) + ('  |' if guides else '|')
+
+	def _displayColumn(self, y, guides=True):
+		return (4 if guides else 2) + 2 * y
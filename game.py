@@ -5,35 +5,48 @@ Basic usage:
 `g = api.start_game()`
 """
 
-import copy
 import time
 import math
 import random
+import bisect
+import collections
+import numpy as np
 from functionality import MinesweeperFunctions
 
 """
 Public members:
 
 CELL_CODE
+LEVEL_CODE
 __init__(options=None)
 populateBoard(level='BEGINNER', specs={})
-open(x, y)
-flag(x, y)
-unflag(x, y)
-chord(x, y)
+loadBoard(content)
+loadBoards(contents, options=None, seeds=None) # static
+open(x, y, changes=False)
+flag(x, y, changes=False)
+unflag(x, y, changes=False)
+chord(x, y, changes=False)
 consoleDisplaySolution()
 consoleDisplayVisible()
 getBombsLeft()
 getTimeElapsed()
 getBoardHeight()
 getBoardWidth()
-exportGame() # somewhat broken
-importGame(board) # somewhat broken
+exportGame()
+importGame(board, bombsLeft=None, timeElapsed=0)
+getRecordType(height, width) # static
+makeRecords(contents) # static
+exportRecord()
+importRecord(record, height, width)
+exportBinary()
+importBinary(data)
 getGameVisible()
 getGameSolution()
+getVersion()
+getChangesSince(version)
 """
 class Game(MinesweeperFunctions):
-	__LEVEL_CODE = {
+	LEVEL_CODE = {
 		'BEGINNER': {
 			'height': 8,
 			'width': 8,
@@ -60,6 +73,31 @@ class Game(MinesweeperFunctions):
 		'WON': 5,
 	}
 
+	# The board is kept in two int8 arrays, one for the content of each cell
+	# and one for its status. Contents 0-8 are the number of neighboring bombs
+	__BOMB = 9
+	# Header of the bytes made by exportBinary
+	__BINARY_MAGIC = b'MSWP2'
+	__BINARY_HEADER = np.dtype([('MAGIC', 'S5'), ('HEIGHT', '<u2'), ('WIDTH', '<u2')])
+
+	# Random draws made to find a new place for a bomb moved away from the first click,
+	# before picking among the free cells directly
+	__MOVE_TRIES = 100
+	__STATUS_VALUE = {
+		'COVERED': 0,
+		'FLAGGED': 1,
+		'OPENED': 2,
+	}
+
+	# Translates the arrays back into the codes used by the rest of the program:
+	# indices 0-9 are contents and 10-12 are statuses (offset by __STATUS_OFFSET)
+	__STATUS_OFFSET = 10
+	__CELL_CODES = np.array(
+		[MinesweeperFunctions._CONTENT_CODE[str(i)] for i in range(9)]
+		+ [MinesweeperFunctions._CONTENT_CODE['BOMB']]
+		+ [MinesweeperFunctions._STATUS_CODE[c] for c in ('COVERED', 'FLAGGED', 'OPENED')],
+		dtype=object)
+
 	# options
 	__DEBUG = False
 	__DISPLAY_ON_MOVE = True
@@ -68,12 +106,29 @@ class Game(MinesweeperFunctions):
 	__REUSE_SEED = False
 	__PRINT_SEED = True
 	__SILENT = False
+	# A render.ConsoleRenderer to show the moves with, instead of printing the whole board each time
+	__RENDERER = None
+
+	# Every game draws from its own random stream instead of the global one,
+	# so that games running side by side do not change each other's boards
+	# It is only made once it is needed (see __getRandom)
+	__RANDOM = None
 
 	# game data
-	__BOARD = []
+	__CONTENT = None
+	__STATUS = None
 	__GAME_STATE = __STATE_CODE['NOT_PLAYING']
-	__CHORD_STARTED = False
 	__TOTAL_BOMBS = 0
+	# Running counters for end-of-game detection, updated whenever a cell is opened
+	__SAFE_COVERED = 0
+	__BOMB_OPENED = False
+	# Log of the cells whose status changed, so that clients can keep their own copy
+	# of the visible board up to date. Each entry is an array of flat indices 
+	# (x * width + y) changed by one action. The version is the number of cell
+	# changes so far, and __CHANGE_VERSIONS holds the version each entry starts at
+	__CHANGES = None
+	__CHANGE_VERSIONS = None
+	__VERSION = 0
 	__BOMBS_LEFT = 0
 	__START_TIME = 0
 	__END_TIME = 0
@@ -94,31 +149,54 @@ class Game(MinesweeperFunctions):
 				self.__REUSE_SEED = options['REUSE_SEED']
 			if 'PRINT_SEED' in options:
 				self.__PRINT_SEED = options['PRINT_SEED']
+			if 'RENDERER' in options:
+				self.__RENDERER = options['RENDERER']
 			if 'SILENT' in options:
 				self.__SILENT = options['SILENT']
 				self.__DISPLAY_ON_MOVE = False
 				self.__PRINT_SEED = False
 
+		self.__resetChanges()
+
 		# For users that want a seed but don't want to supply it
 		self.__SEED = random.randrange(100000) if self.__SEED == None else self.__SEED
 		if self.__SEED != None and not self.__REUSE_SEED:
 			if self.__PRINT_SEED:
 				print('Initializing with seed = {}'.format(self.__SEED))
-			random.seed(self.__SEED)
+
+	# Returns the random stream of the game, made from its seed on first use
+	# Most games never need it, since a first click only moves bombs when it is near one
+	def __getRandom(self):
+		if self.__RANDOM is None:
+			self.__RANDOM = random.Random(self.__SEED)
+		return self.__RANDOM
 
 	# Decorator to check whether x, y are within board height and width ranges
 	def __validateArguments(func):
 		def inner1(self, x, y):
-			if x not in range(len(self.__BOARD)) or y not in range(len(self.__BOARD[0])):
-				if len(self.__BOARD) == 0:
+			if x not in range(self.getBoardHeight()) or y not in range(self.getBoardWidth()):
+				if self.getBoardHeight() == 0:
 					message = 'board is not yet initialized. Cannot call {}({}, {}).'.format(func.__name__,x,y)
 					raise ValueError(message)
-				message = '({},{}) are invalid arguments for board of size ({}, {}).'.format(x,y,len(self.__BOARD), len(self.__BOARD[0]))
+				message = '({},{}) are invalid arguments for board of size ({}, {}).'.format(x,y,self.getBoardHeight(), self.getBoardWidth())
 				raise ValueError(message)
 			return func(self, x, y)
 
 		return inner1
 
+	# Decorator that lets a move report what it changed. Called with changes=True, 
+	# the move returns (result, cells) where cells is the list of (x, y, code)
+	# for every cell whose status the move changed, as in getChangesSince
+	def __reportChanges(func):
+		def inner1(self, x, y, changes=False):
+			version = self.__VERSION
+			result = func(self, x, y)
+			if changes:
+				return (result, self.getChangesSince(version))
+			return result
+
+		return inner1
+
 	# Decorator to check the game state. Accomplishes two tasks:
 	# 1. Will only allow actions when state is 'PLAYING'
 	# 2. Will update state from 'PLAYING' to 'WON'/'LOST' upon game end
@@ -139,7 +217,7 @@ class Game(MinesweeperFunctions):
 				self.__END_TIME = time.time() - self.__START_TIME
 				self.__GAME_STATE = self.__STATE_CODE['LOST']
 				if self.__DISPLAY_ON_MOVE:
-					self.consoleDisplayVisible()
+					self.__display(force=True)
 				if not self.__SILENT:
 					print('Game lost!')
 				return False
@@ -149,7 +227,7 @@ class Game(MinesweeperFunctions):
 				self.__cleanBoard()
 				self.__GAME_STATE = self.__STATE_CODE['WON']
 				if self.__DISPLAY_ON_MOVE:
-					self.consoleDisplayVisible()
+					self.__display(force=True)
 				if not self.__SILENT:
 					print('Game won!')
 				return True
@@ -158,62 +236,60 @@ class Game(MinesweeperFunctions):
 
 		return inner1
 
-	# Do not try to simplify the following functions into one helper function.
-	# I tried. It would need to provide the following results: 
-	#           lost?     won?
-	# switch:	T T T T   F F F F
-	# isBomb:	T T F F   T T F F
-	# isOpen:	T F T F   T F T F
-	# 			-----------------
-	# return:	T F F F   T T T F
-	# The logic required is: ((b xnor s) and (o xnor s)) xnor s 
-	# It is too ridiculous to implement. Stick with the simple, understandable functions. 
+	# Both checks read the running counters kept by __change_status, 
+	# so they cost the same no matter how big the board is
 	def __lostCheck(self):
-		for x in self.__BOARD:
-			for y in x:
-				isBomb = y['CONTENT'] == self._CONTENT_CODE['BOMB']
-				isOpen = y['STATUS'] == self._STATUS_CODE['OPENED']
-
-				if isBomb and isOpen:
-					return True
-		return False
+		return self.__BOMB_OPENED
 
 	def __wonCheck(self):
-		for x in self.__BOARD:
-			for y in x:
-				isNotBomb = y['CONTENT'] != self._CONTENT_CODE['BOMB']
-				isNotOpen = y['STATUS'] != self._STATUS_CODE['OPENED']
+		return self.__SAFE_COVERED == 0
 
-				if isNotBomb and isNotOpen:
-					return False
-		return True
+	# Recomputes the running counters from the board arrays
+	# Only needed when the board is replaced wholesale (populating or importing)
+	def __resetCounters(self):
+		isBomb = self.__CONTENT == self.__BOMB
+		isOpen = self.__STATUS == self.__STATUS_VALUE['OPENED']
+		self.__SAFE_COVERED = int(np.count_nonzero(~isBomb & ~isOpen))
+		self.__BOMB_OPENED = bool(np.any(isBomb & isOpen))
 
+	# Once the game is won, every covered cell is a bomb, so flag them all at once
 	def __cleanBoard(self):
-		for x in range(len(self.__BOARD)):
-			for y in range(len(self.__BOARD[x])):
-				try:
-					self.flag(x, y)
-				except:
-					pass
+		isCovered = self.__STATUS == self.__STATUS_VALUE['COVERED']
+		self.__STATUS[isCovered] = self.__STATUS_VALUE['FLAGGED']
+		self.__logChanges(np.flatnonzero(isCovered))
 		self.__BOMBS_LEFT = 0
 
+	# Starts a new, empty change log. Clients holding a version from before
+	# this should get the whole board again with getGameVisible
+	def __resetChanges(self):
+		self.__CHANGES = []
+		self.__CHANGE_VERSIONS = []
+		self.__VERSION = 0
+		if self.__RENDERER is not None:
+			self.__RENDERER.invalidate()
+
+	# Adds one entry to the change log, given the flat indices of the changed cells
+	def __logChanges(self, indices):
+		if len(indices) > 0:
+			self.__CHANGES.append(np.asarray(indices, dtype=np.int64))
+			self.__CHANGE_VERSIONS.append(self.__VERSION)
+			self.__VERSION = self.__VERSION + len(indices)
+
 	# Expects level supplied as string and specs supplied as dict
 	# Available specs are 'height', 'width', and 'bombs'
 	# If all three specs are not supplied, the default from the given level 
 	# will be used. The level itself defaults to beginner, which is 8x8, 10 bombs
 	def populateBoard(self, level='BEGINNER', specs={}):
 		if self.__REUSE_SEED:
-			if self.PRINT_SEED:
+			if self.__PRINT_SEED:
 				print('Populating board with seed = {}'.format(self.__SEED))
-			random.seed(self.__SEED)
-
-		self.__BOARD = []
+			self.__getRandom().seed(self.__SEED)
 
 		# Validate arguments
-		if level in self.__LEVEL_CODE:
-			h = self.__LEVEL_CODE[level]['height']
-			w = self.__LEVEL_CODE[level]['width']
-			b = self.__LEVEL_CODE[level]['bombs']
+		if level in self.LEVEL_CODE:
+			h = self.LEVEL_CODE[level]['height']
+			w = self.LEVEL_CODE[level]['width']
+			b = self.LEVEL_CODE[level]['bombs']
 		else:
 			raise ValueError('Invalid Level Code. Please choose one of \'BEGINNER\', \'INTERMEDIATE\', or \'EXPERT\'.')
 		if 'height' in specs:
@@ -226,53 +302,118 @@ class Game(MinesweeperFunctions):
 		if h <= 0 or w <= 0 or b >= h * w:
 			raise ValueError('Invalid parameters: can not make a board of size {}x{} with {} bombs'.format(h,w,b))
 
-		# Add all cells, set status to covered
-		[self.__BOARD.append([{'STATUS': self._STATUS_CODE['COVERED'], 'CONTENT': self._CONTENT_CODE['0']} for i in range(w)]) for j in range(h)]
-
-		self.__TOTAL_BOMBS = b
-		self.__BOMBS_LEFT = b
+		self.__CONTENT = np.zeros((h, w), dtype=np.int8)
 
 		# Set cell content to bomb for b number of bombs, randomly placed
+		randomStream = self.__getRandom()
 		while b > 0:
-			x = random.randrange(h)
-			y = random.randrange(w)
-			if self.__BOARD[x][y]['CONTENT'] != self._CONTENT_CODE['BOMB']:
-				self.__BOARD[x][y].update({'CONTENT': self._CONTENT_CODE['BOMB']})
+			x = randomStream.randrange(h)
+			y = randomStream.randrange(w)
+			if self.__CONTENT[x, y] != self.__BOMB:
+				self.__CONTENT[x, y] = self.__BOMB
 				b = b - 1
 
-		for x in range(h):
-			for y in range(w):
-				if self.__BOARD[x][y]['CONTENT'] != self._CONTENT_CODE['BOMB']:
-					self.__BOARD[x][y].update({'CONTENT': self._CONTENT_CODE[str(self._countNeighbors(self.__BOARD, (x, y), 'BOMB', status_on=False))]})
+		# Count the neighboring bombs of every cell at once
+		bombs = self.__CONTENT == self.__BOMB
+		self.__setBoard(np.where(bombs, self.__BOMB, self._sumNeighbors(bombs)).astype(np.int8))
+
+	# Starts a new game on a board that was made elsewhere, such as by BoardFactory
+	# Expects a 2D array of cell contents: the number of neighboring bombs of each cell,
+	# or 9 for a bomb. Every cell starts out covered, as after populateBoard
+	def loadBoard(self, content):
+		content = np.array(content, dtype=np.int8)
+		if content.ndim != 2 or content.size == 0:
+			raise ValueError('Invalid board: expected a non-empty 2D array of cell contents')
+		if np.any((content < 0) | (content > self.__BOMB)):
+			raise ValueError('Invalid board: cell contents must be between 0 and {}'.format(self.__BOMB))
+		self.__setBoard(content)
+
+	# Returns a list of new games, one for each board in contents (an array of shape
+	# (n, height, width) of cell contents as in loadBoard), each as if made by Game(options)
+	# and loadBoard, with seeds[i] as the SEED of game i if given
+	# Much faster for many boards: the contents are checked and their bombs counted for
+	# all of the boards at once, and every game starts as a copy of one made with the options
+	@staticmethod
+	def loadBoards(contents, options=None, seeds=None):
+		contents = np.array(contents, dtype=np.int8)
+		if contents.ndim != 3 or contents.shape[1] == 0 or contents.shape[2] == 0:
+			raise ValueError('Invalid boards: expected a 3D array of cell contents')
+		if np.any((contents < 0) | (contents > Game.__BOMB)):
+			raise ValueError('Invalid board: cell contents must be between 0 and {}'.format(Game.__BOMB))
+		bombs = np.count_nonzero(contents == Game.__BOMB, axis=(1, 2)).tolist()
+
+		template = Game(options=options)
+		games = []
+		for i in range(len(contents)):
+			game = object.__new__(Game)
+			game.__dict__.update(template.__dict__)
+			if seeds is not None:
+				game.__SEED = seeds[i]
+			game.__setBoard(contents[i].copy(), bombs[i])
+			games.append(game)
+		return games
+
+	# Starts a new game on the board, with every cell covered
+	# bombs is the number of bombs on it, counted here if not given
+	def __setBoard(self, content, bombs=None):
+		self.__CONTENT = content
+		self.__STATUS = np.full(content.shape, self.__STATUS_VALUE['COVERED'], dtype=np.int8)
+
+		self.__TOTAL_BOMBS = int(np.count_nonzero(content == self.__BOMB)) if bombs is None else bombs
+		self.__BOMBS_LEFT = self.__TOTAL_BOMBS
+
+		# With every cell covered, no bomb is opened and every safe cell is still covered
+		self.__SAFE_COVERED = content.size - self.__TOTAL_BOMBS
+		self.__BOMB_OPENED = False
+		self.__resetChanges()
 
 		self.__START_TIME = 0
 		self.__END_TIME = 0
 		self.__GAME_STATE = self.__STATE_CODE['READY_TO_PLAY']
 
 	def __displayOnMove(self):
-		if self.__DISPLAY_ON_MOVE and not self.__CHORD_STARTED:
+		if self.__DISPLAY_ON_MOVE:
 			if self.__GAME_STATE == self.__STATE_CODE['PLAYING'] or self.__GAME_STATE == self.__STATE_CODE['READY_TO_PLAY']:
-				self.consoleDisplayVisible()
+				self.__display()
 
-	@__stateCheck
-	def __change_status(self, cell, code, altcode):
-		if cell['STATUS'] == self._STATUS_CODE[code]:
-			cell['STATUS'] = self._STATUS_CODE[altcode]
+	# Shows the visible board, through the renderer if there is one
+	# The renderer may leave the move for its next frame, unless force is True
+	def __display(self, force=False):
+		if self.__RENDERER is None:
+			self.consoleDisplayVisible()
+		else:
+			self.__RENDERER.render(self, force)
 
+	@__stateCheck
+	def __change_status(self, x, y, code, altcode):
+		if self.__STATUS[x, y] == self.__STATUS_VALUE[code]:
+			self.__STATUS[x, y] = self.__STATUS_VALUE[altcode]
+			self.__logChanges([x * self.getBoardWidth() + y])
+
+			# Keep the end-of-game counters up to date
+			if altcode == 'OPENED':
+				if self.__CONTENT[x, y] == self.__BOMB:
+					self.__BOMB_OPENED = True
+				else:
+					self.__SAFE_COVERED = self.__SAFE_COVERED - 1
+
+	@__reportChanges
 	@__validateArguments
 	def flag(self, x, y):
-		self.__change_status(self.__BOARD[x][y], 'COVERED', 'FLAGGED')
+		self.__change_status(x, y, 'COVERED', 'FLAGGED')
 
 		if self.__GAME_STATE == self.__STATE_CODE['PLAYING'] or self.__GAME_STATE == self.__STATE_CODE['READY_TO_PLAY']:
 			self.__BOMBS_LEFT = self.__BOMBS_LEFT - 1
 		self.__displayOnMove()
 
+	@__reportChanges
 	@__validateArguments
 	def unflag(self, x, y):
-		self.__change_status(self.__BOARD[x][y], 'FLAGGED', 'COVERED')
+		self.__change_status(x, y, 'FLAGGED', 'COVERED')
 		self.__BOMBS_LEFT = self.__BOMBS_LEFT + 1
 		self.__displayOnMove()
 
+	@__reportChanges
 	@__validateArguments
 	def open(self, x, y):
 		if self.__GAME_STATE == self.__STATE_CODE['READY_TO_PLAY']:
@@ -282,18 +423,16 @@ class Game(MinesweeperFunctions):
 			self.__GAME_STATE = self.__STATE_CODE['PLAYING']
 			self.__START_TIME = time.time()
 
-		cell = self.__BOARD[x][y]
-		gameEnd = self.__change_status(cell, 'COVERED', 'OPENED')
+		# Opening an empty cell also opens the whole empty region around it
+		if self.__CONTENT[x, y] == 0:
+			gameEnd = self.__openRegion([(x, y)])
+		else:
+			gameEnd = self.__change_status(x, y, 'COVERED', 'OPENED')
 
-		if self.__BOARD[x][y]['CONTENT'] == self._CONTENT_CODE['BOMB']:
-			self.__BOMBS_LEFT = self.__BOMBS_LEFT - 1
+			if self.__CONTENT[x, y] == self.__BOMB:
+				self.__BOMBS_LEFT = self.__BOMBS_LEFT - 1
 
-		# Chord if empty and not currently in the process of chording
-		if self.__mergeVisible(cell, 'STATUS') == self._CONTENT_CODE['0'] and not self.__CHORD_STARTED:
-			possibleGameEnd = self.chord(x, y)
-			gameEnd = possibleGameEnd if possibleGameEnd else gameEnd
-		else:
-			self.__displayOnMove()
+		self.__displayOnMove()
 
 		return gameEnd
 
@@ -303,186 +442,193 @@ class Game(MinesweeperFunctions):
 	# Whether the given cell is a bomb or not, it returns a list of all neighbors
 	# around (x, y) which are bombs themselves
 	def __moveBomb(self, x, y, a, b):
-		neighbors = self._getAllNeighbors(self.__BOARD, (x, y))
-		bombNeighbors = [n for n in neighbors if self.__BOARD[n[0]][n[1]]['CONTENT'] == self._CONTENT_CODE['BOMB']]
+		neighbors = self._getAllNeighbors(self.__CONTENT, (x, y))
+		bombNeighbors = [n for n in neighbors if self.__CONTENT[n] == self.__BOMB]
 
-		if self.__BOARD[x][y]['CONTENT'] != self._CONTENT_CODE['BOMB']:
+		if self.__CONTENT[x, y] != self.__BOMB:
 			return bombNeighbors
 
-		value = len(bombNeighbors)
-		self.__BOARD[x][y]['CONTENT'] = self._CONTENT_CODE[str(value)]
+		self.__CONTENT[x, y] = len(bombNeighbors)
 
 		for n in neighbors:
 			if n not in bombNeighbors:
-				value = self.__BOARD[n[0]][n[1]]['CONTENT'] - 1
-				self.__BOARD[n[0]][n[1]]['CONTENT'] = self._CONTENT_CODE[str(value)]
+				self.__CONTENT[n] -= 1
 
+		tries = 0
 		while True:
 			# TODO Should the user be asked to pass in another seed for randomly displacing bombs?
 			# Currently, because the generation of the board is the same for every successive run with a given seed, 
 			# the new location of displaced bombs will also be the same for every successive run with that seed
-			i = random.randrange(len(self.__BOARD))
-			j = random.randrange(len(self.__BOARD[0]))
-			if self.__BOARD[i][j]['CONTENT'] != self._CONTENT_CODE['BOMB']:
+			i = self.__getRandom().randrange(self.getBoardHeight())
+			j = self.__getRandom().randrange(self.getBoardWidth())
+			if self.__CONTENT[i, j] != self.__BOMB:
 				# Compare to where the actual location is
-				if (i, j) not in self._getAllNeighbors(self.__BOARD, (a, b)) and (i, j) != (a, b):
-					self.__BOARD[i][j]['CONTENT'] = self._CONTENT_CODE['BOMB']
+				if (i, j) not in self._getAllNeighbors(self.__CONTENT, (a, b)) and (i, j) != (a, b):
+					self.__CONTENT[i, j] = self.__BOMB
 					break
 
-		newNeighbors = self._getAllNeighbors(self.__BOARD, (i, j))
-		newBombNeighbors = [n for n in newNeighbors if self.__BOARD[n[0]][n[1]]['CONTENT'] == self._CONTENT_CODE['BOMB']]
+			# On a crowded board random draws rarely hit a free cell, so after enough
+			# misses pick one of the free cells directly. If there is none, the bomb stays
+			tries = tries + 1
+			if tries == self.__MOVE_TRIES:
+				free = self.__CONTENT != self.__BOMB
+				free[a, b] = False
+				for n in self._getAllNeighbors(self.__CONTENT, (a, b)):
+					free[n] = False
+				cells = np.flatnonzero(free)
+				i, j = divmod(int(cells[self.__getRandom().randrange(len(cells))]), self.getBoardWidth()) if len(cells) > 0 else (x, y)
+				self.__CONTENT[i, j] = self.__BOMB
+				break
+
+		newNeighbors = self._getAllNeighbors(self.__CONTENT, (i, j))
 
 		for n in newNeighbors:
-			if n not in newBombNeighbors:
-				value = self.__BOARD[n[0]][n[1]]['CONTENT']
-				value = (0 if value == self._CONTENT_CODE['0'] else value) + 1
-				self.__BOARD[n[0]][n[1]]['CONTENT'] = self._CONTENT_CODE[str(value)]
+			if self.__CONTENT[n] != self.__BOMB:
+				self.__CONTENT[n] += 1
 
 		return bombNeighbors
 
+	# Opens the covered neighbors of an opened cell touching as many flags as its number
+	# Like open, returns True if this won the game, False if it lost it, and None otherwise,
+	# including when the cell can not be chorded
+	@__reportChanges
 	@__validateArguments
 	def chord(self, x, y):
 		# Can not chord on covered or flagged cells
-		if self.__BOARD[x][y]['STATUS'] != self._STATUS_CODE['OPENED']:
+		if self.__STATUS[x, y] != self.__STATUS_VALUE['OPENED']:
 			if not self.__SILENT:
 				print('Cannot chord on covered or flagged cells')
 			return
 
-		# Start and end the chord
-		self.__CHORD_STARTED = True
-		gameEnd = self.__chordOpen([(x, y)])
-		self.__CHORD_STARTED = False
+		# Can not chord on cells that don't have all neighbor bombs flagged
+		neighbors = self._getAllNeighbors(self.__STATUS, (x, y))
+		flagged = [n for n in neighbors if self.__STATUS[n] == self.__STATUS_VALUE['FLAGGED']]
+		if len(flagged) != self.__CONTENT[x, y]:
+			if not self.__SILENT:
+				print('Cannot chord on cells that are touching the wrong number of flags')
+			return
+
+		gameEnd = self.__openRegion(neighbors)
 
 		self.__displayOnMove()
 
 		return gameEnd
 
-	# Recursive function which takes a list of tuples representing cell coordinates
-	# Assumes that all of the cells have been opened
-	# Checks that all of the cells have their neighbor bombs flagged, then constructs
-	# a list of neighbor cell coordinates. Proceeds to open all neighbor cells that
-	# are currently covered, then recursively calls itself on all neighbor cells that
-	# are empty. 
-	# Note: User would expect upon chording a cell that any empty cells that got opened
-	# would chord themselves automatically. 
-	# Base case: when list of neighbor cells to open in the next layer is empty, return
-	def __chordOpen(self, coordinates):
-		# Can not chord on cells that don't have all neighbor bombs flagged
-		for c in coordinates:
-			content = self.__BOARD[c[0]][c[1]]['CONTENT']
-			content = 0 if content == ' ' else content
-			if self._countNeighbors(self.__BOARD, c, 'FLAGGED', status_on=True) != content:
-				if not self.__SILENT:
-					print('Cannot chord on cells that are touching the wrong number of flags')
-				return False
+	# Opens every covered cell in the given list of coordinates. Whenever an empty
+	# cell gets opened, the whole empty region around it and its numbered border 
+	# are opened too, since the user would expect them to open automatically. 
+	# The region is walked one row-run of empty cells at a time using a worklist
+	# (breadth first) instead of recursion, so it does not matter how big it is. 
+	# The game state is checked only once, after everything has been opened
+	@__stateCheck
+	def __openRegion(self, coordinates):
+		covered = self.__STATUS_VALUE['COVERED']
+		opened = self.__STATUS_VALUE['OPENED']
+		h = self.getBoardHeight()
+		w = self.getBoardWidth()
+
+		# Worklist entries are (row, index of the run within that row)
+		runs = {}
+		visited = set()
+		worklist = collections.deque()
+		openedCells = []
 
-		allNeighbors = []
 		for c in coordinates:
-			allNeighbors.extend(self._getAllNeighbors(self.__BOARD, c))
-
-		# Remove duplicates and filter out any which are flagged or opened
-		allNeighbors = list(set(allNeighbors))
-		allNeighbors = [n for n in allNeighbors if self.__BOARD[n[0]][n[1]]['STATUS'] == self._STATUS_CODE['COVERED']]
-
-		for n in allNeighbors:
-			value = self.open(n[0], n[1])
-			if value == True:
-				return True
-			elif value == False:
-				return False
-
-		# Filter out all recently opened neighbors that are not empty
-		allNeighbors = [n for n in allNeighbors if self.__BOARD[n[0]][n[1]]['CONTENT'] == self._CONTENT_CODE['0']]
+			if self.__STATUS[c] != covered:
+				continue
+
+			self.__STATUS[c] = opened
+			openedCells.append(c[0] * w + c[1])
+			if self.__CONTENT[c] == self.__BOMB:
+				self.__BOMB_OPENED = True
+				self.__BOMBS_LEFT = self.__BOMBS_LEFT - 1
+				self.__logChanges(openedCells)
+				return
 
-		if len(allNeighbors) == 0:
+			self.__SAFE_COVERED = self.__SAFE_COVERED - 1
+			if self.__CONTENT[c] == 0:
+				starts, ends = self.__emptyRuns(c[0], runs)
+				run = (c[0], bisect.bisect_right(starts, c[1]) - 1)
+				if run not in visited:
+					visited.add(run)
+					worklist.append(run)
+
+		found = []
+		while len(worklist) > 0:
+			x, i = worklist.popleft()
+			starts, ends = runs[x]
+			left, right = starts[i], ends[i]
+			found.append((x, left, right))
+
+			# Continue with the runs of empty cells touching this one in the rows above and below
+			for row in (x - 1, x + 1):
+				if row < 0 or row >= h:
+					continue
+				starts, ends = self.__emptyRuns(row, runs)
+				for j in range(bisect.bisect_left(ends, left - 1), bisect.bisect_right(starts, right + 1)):
+					if (row, j) not in visited:
+						visited.add((row, j))
+						worklist.append((row, j))
+
+		if len(found) == 0:
+			self.__logChanges(openedCells)
 			return
-		else:
-			return self.__chordOpen(allNeighbors)
+
+		# Every cell touching a run of empty cells is safe. Mark the rows above, on, 
+		# and below each run with +1/-1 at its ends, and a running sum along each row
+		# then tells which cells are touched. Only the bounding box of the region is used
+		rows, lefts, rights = np.array(found).T
+		top = max(rows.min() - 1, 0)
+		bottom = min(rows.max() + 2, h)
+		first = max(lefts.min() - 1, 0)
+		last = min(rights.max() + 2, w)
+
+		# Offsets so that the one-cell border around the box always has somewhere to go
+		width = last - first + 3
+		starts = np.concatenate([(rows + i - top) * width + lefts - first for i in range(3)])
+		ends = np.concatenate([(rows + i - top) * width + rights + 3 - first for i in range(3)])
+		size = (bottom - top + 2) * width
+		marks = np.bincount(starts, minlength=size) - np.bincount(ends, minlength=size)
+		touched = np.cumsum(marks.reshape(-1, width), axis=1)[1:bottom - top + 1, 1:last - first + 1] > 0
+
+		box = self.__STATUS[top:bottom, first:last]
+		newlyOpened = touched & (box == covered)
+		self.__SAFE_COVERED = self.__SAFE_COVERED - int(np.count_nonzero(newlyOpened))
+		box[newlyOpened] = opened
+
+		rows, columns = np.nonzero(newlyOpened)
+		self.__logChanges(np.concatenate((np.array(openedCells, dtype=np.int64), (rows + top) * w + columns + first)))
+
+	# Returns the start and end columns (inclusive) of each run of empty cells in 
+	# the given row, caching them in runs so each row is only looked at once. 
+	# Flagged cells are left alone, so they break up the runs
+	def __emptyRuns(self, row, runs):
+		if row not in runs:
+			isEmpty = (self.__CONTENT[row] == 0) & (self.__STATUS[row] != self.__STATUS_VALUE['FLAGGED'])
+			isEmpty = np.concatenate(([False], isEmpty, [False]))
+			edges = np.flatnonzero(isEmpty[1:] != isEmpty[:-1])
+			runs[row] = (edges[0::2].tolist(), (edges[1::2] - 1).tolist())
+		return runs[row]
 
 	# If the code is 'STATUS', then I am trying to display what the user would be seeing
 	# The user would not see the code for opened cells, they would instead see the value
 	# of the cell taking the place of its status
 	# So if the status is opened, I will always return the content
-	def __mergeVisible(self, cell, code):
-		if cell['STATUS'] == self._STATUS_CODE['OPENED']:
-			return cell['CONTENT']
-		else:
-			return cell[code]
+	# Returns an array of indices into __CELL_CODES
+	def __mergeVisible(self, code):
+		if code == 'CONTENT':
+			return self.__CONTENT
+		isOpen = self.__STATUS == self.__STATUS_VALUE['OPENED']
+		return np.where(isOpen, self.__CONTENT, self.__STATUS + self.__STATUS_OFFSET)
 
-	# TODO put this also in functionality
+	# Prints the whole display at once, laid out by _formatBoard
 	def __consoleDisplay(self, code):
-		if len(self.__BOARD) == 0:
+		if self.getBoardHeight() == 0:
 			message = 'Board is not yet initialized. Cannot call display.'
 			raise ValueError(message)
 
-		printedBoard = []
-
-		# Top fancy bit
-		temp = '/===' if self.__PRINT_GUIDES else '/='
-		for y in self.__BOARD[0]:
-			temp = temp + '=='
-		temp = temp + '\\'
-		printedBoard.append(temp)
-
-		# Number of seconds elapsed
-		temp = '| '
-		message = 'Time: {0:.2f}'.format(self.getTimeElapsed())
-		temp = temp + message
-		for column in range((2 * len(self.__BOARD[0])) - len(message)):
-			temp = temp + ' '
-		temp = temp + '  |' if self.__PRINT_GUIDES else '|'
-		printedBoard.append(temp)
-
-		# Number of bombs left
-		temp = '| '
-		message = 'Bombs left: {}'.format(self.__BOMBS_LEFT)
-		temp = temp + message
-		for column in range((2 * len(self.__BOARD[0])) - len(message)):
-			temp = temp + ' '
-		temp = temp + '  |' if self.__PRINT_GUIDES else '|'
-		printedBoard.append(temp)
-
-		# Separation bit
-		temp = '|===' if self.__PRINT_GUIDES else '|='
-		for y in self.__BOARD[0]:
-			temp = temp + '=='
-		temp = temp + '|'
-		printedBoard.append(temp)
-
-		# Column numbers or empty line
-		temp = '|   ' if self.__PRINT_GUIDES else '| '
-		for column in range(len(self.__BOARD[0])):
-			temp = temp + '{} '.format(str(column % 10)) if self.__PRINT_GUIDES else '  '
-		temp = temp + '|'
-		printedBoard.append(temp)
-
-		# Row contents
-		for row in range(len(self.__BOARD)):
-			temp = ''
-			# Print the row number before the row contents
-			temp = temp + '| {} '.format(str(row % 10)) if self.__PRINT_GUIDES else '| '
-
-			for y in self.__BOARD[row]:
-				temp = temp + '{} '.format(self.__mergeVisible(y, code))
-			temp = temp + '|'
-			printedBoard.append(temp)
-
-		# Empty line
-		temp = '|   ' if self.__PRINT_GUIDES else '| '
-		for y in self.__BOARD[0]:
-			temp = temp + '  '
-		temp = temp + '|'
-		printedBoard.append(temp)
-
-		# Bottom fancy bit
-		temp = '\\===' if self.__PRINT_GUIDES else '\\='
-		for y in self.__BOARD[0]:
-			temp = temp + '=='
-		temp = temp + '/'
-		printedBoard.append(temp)
-
-		for p in printedBoard:
-			print(p)
+		board = self.__getBoard(code)
+		print('\n'.join(self._formatBoard(board, self.getTimeElapsed(), self.__BOMBS_LEFT, self.__PRINT_GUIDES)))
 
 	def consoleDisplayVisible(self):
 		self.__consoleDisplay('STATUS')
@@ -503,33 +649,153 @@ class Game(MinesweeperFunctions):
 		return time.time() - self.__START_TIME
 
 	def getBoardHeight(self):
-		return len(self.__BOARD)
+		return 0 if self.__CONTENT is None else self.__CONTENT.shape[0]
 
 	def getBoardWidth(self):
-		return len(self.__BOARD[0]) if self.getBoardHeight() > 0 else 0
+		return 0 if self.__CONTENT is None else self.__CONTENT.shape[1]
 
-	# TODO export and import are broken
-	# There needs to be a way to import the game state
-	# As well as the number of bombs left and time
 	def exportGame(self):
-		return copy.deepcopy(self.__BOARD)
+		content = self.__getBoard('CONTENT')
+		status = self.__CELL_CODES[self.__STATUS + self.__STATUS_OFFSET].tolist()
+		return [[{'STATUS': status[i][j], 'CONTENT': content[i][j]} 
+				for j in range(self.getBoardWidth())]
+			for i in range(self.getBoardHeight())]
+
+	# Takes a board as returned by exportGame. Bombs left defaults to the total number
+	# of bombs minus the flagged cells, and timeElapsed is the time already played
+	def importGame(self, board, bombsLeft=None, timeElapsed=0):
+		contentCodes = self.__CELL_CODES[:self.__STATUS_OFFSET].tolist()
+		statusCodes = self.__CELL_CODES[self.__STATUS_OFFSET:].tolist()
+		self.__CONTENT = np.array([[contentCodes.index(cell['CONTENT']) for cell in row] for row in board], dtype=np.int8)
+		self.__STATUS = np.array([[statusCodes.index(cell['STATUS']) for cell in row] for row in board], dtype=np.int8)
+
+		self.__TOTAL_BOMBS = int(np.count_nonzero(self.__CONTENT == self.__BOMB))
+		flagged = int(np.count_nonzero(self.__STATUS == self.__STATUS_VALUE['FLAGGED']))
+		self.__BOMBS_LEFT = self.__TOTAL_BOMBS - flagged if bombsLeft is None else bombsLeft
+		self.__resetCounters()
+		self.__resetChanges()
 
-	def importGame(self, board, game_state, start_time, pause_time):
-		self.__BOARD = copy.deepcopy(board)
 		# If none of the cells have been opened, 
 		# then the state is READY_TO_PLAY
-		playing = False
-		for row in self.__BOARD:
-			for cell in row:
-				if cell['CONTENT'] != self._CONTENT_CODE['COVERED'] and cell['CONTENT'] != self._CONTENT_CODE['FLAGGED']:
-					playing = True
-		
-		self.__GAME_STATE = self.__STATE_CODE['PLAYING'] if playing else self.__STATE_CODE['READY_TO_PLAY']
+		if self.__lostCheck():
+			state = 'LOST'
+		elif bool(np.any(self.__STATUS == self.__STATUS_VALUE['OPENED'])):
+			state = 'WON' if self.__wonCheck() else 'PLAYING'
+		else:
+			state = 'READY_TO_PLAY'
+		self.__setState(self.__STATE_CODE[state], timeElapsed)
 		return True
 
+	# Sets the game state and the clock, as if timeElapsed seconds had been played
+	def __setState(self, state, timeElapsed):
+		self.__GAME_STATE = state
+		if state == self.__STATE_CODE['READY_TO_PLAY']:
+			self.__START_TIME = 0
+			self.__END_TIME = 0
+		else:
+			self.__START_TIME = time.time() - timeElapsed
+			self.__END_TIME = timeElapsed if state == self.__STATE_CODE['LOST'] or state == self.__STATE_CODE['WON'] else 0
+
+	# Returns the numpy dtype of one game in binary form, for a board of the given size
+	# Bomb positions and cell statuses are kept as bit planes (one bit per cell), 
+	# since the numbers on the board follow from the bomb positions
+	@staticmethod
+	def getRecordType(height, width):
+		size = (height * width + 7) // 8
+		return np.dtype([
+			('STATE', np.uint8),
+			('BOMBS_LEFT', '<i4'),
+			('TIME', '<f8'), # seconds played
+			('BOMBS', np.uint8, size),
+			('FLAGGED', np.uint8, size),
+			('OPENED', np.uint8, size),
+		])
+
+	# Returns records (as in exportRecord) for many new, unopened boards at once
+	# Expects an array of shape (n, height, width) of cell contents as in loadBoard
+	@staticmethod
+	def makeRecords(contents):
+		contents = np.asarray(contents)
+		bombs = (contents == Game.__BOMB).reshape(len(contents), -1)
+		records = np.zeros(len(contents), dtype=Game.getRecordType(contents.shape[1], contents.shape[2]))
+		records['STATE'] = Game.__STATE_CODE['READY_TO_PLAY']
+		records['BOMBS_LEFT'] = bombs.sum(axis=1)
+		records['BOMBS'] = np.packbits(bombs, axis=1)
+		return records
+
+	# Returns the game as a single record of getRecordType
+	def exportRecord(self):
+		state = self.__GAME_STATE
+		if state == self.__STATE_CODE['READY_TO_PLAY'] or state == self.__STATE_CODE['NOT_PLAYING']:
+			elapsed = 0
+		elif state == self.__STATE_CODE['LOST'] or state == self.__STATE_CODE['WON']:
+			elapsed = self.__END_TIME
+		else:
+			elapsed = self.getTimeElapsed()
+
+		record = np.zeros((), dtype=self.getRecordType(self.getBoardHeight(), self.getBoardWidth()))
+		record['STATE'] = state
+		record['BOMBS_LEFT'] = self.__BOMBS_LEFT
+		record['TIME'] = elapsed
+		record['BOMBS'] = np.packbits(self.__CONTENT == self.__BOMB)
+		record['FLAGGED'] = np.packbits(self.__STATUS == self.__STATUS_VALUE['FLAGGED'])
+		record['OPENED'] = np.packbits(self.__STATUS == self.__STATUS_VALUE['OPENED'])
+		return record
+
+	# Restores a game from a record made by exportRecord, including its state,
+	# the number of bombs left and the time played. The change log starts over
+	def importRecord(self, record, height, width):
+		cells = height * width
+		bombs = np.unpackbits(record['BOMBS'], count=cells).reshape(height, width).astype(bool)
+		flagged = np.unpackbits(record['FLAGGED'], count=cells).reshape(height, width).astype(bool)
+		opened = np.unpackbits(record['OPENED'], count=cells).reshape(height, width).astype(bool)
+
+		self.__setBoard(np.where(bombs, self.__BOMB, self._sumNeighbors(bombs)).astype(np.int8))
+		self.__STATUS[flagged] = self.__STATUS_VALUE['FLAGGED']
+		self.__STATUS[opened] = self.__STATUS_VALUE['OPENED']
+		self.__BOMBS_LEFT = int(record['BOMBS_LEFT'])
+		self.__resetCounters()
+		self.__setState(int(record['STATE']), float(record['TIME']))
+
+	# Returns the game as bytes: a short header with the size of the board,
+	# followed by the record of exportRecord
+	def exportBinary(self):
+		header = np.array([(self.__BINARY_MAGIC, self.getBoardHeight(), self.getBoardWidth())], dtype=self.__BINARY_HEADER)
+		return header.tobytes() + self.exportRecord().tobytes()
+
+	def importBinary(self, data):
+		header = np.frombuffer(data, dtype=self.__BINARY_HEADER, count=1)[0]
+		if header['MAGIC'] != self.__BINARY_MAGIC:
+			raise ValueError('Invalid data: not a game exported by exportBinary')
+		height = int(header['HEIGHT'])
+		width = int(header['WIDTH'])
+		record = np.frombuffer(data, dtype=self.getRecordType(height, width), count=1, offset=self.__BINARY_HEADER.itemsize)[0]
+		self.importRecord(record, height, width)
+
 	def getGameVisible(self):
 		return self.__getGame('STATUS')
 
+	def getVersion(self):
+		return self.__VERSION
+
+	# Returns a list of (x, y, code) for every cell whose status changed since the 
+	# given version, oldest first, where code is what getGameVisible would now show
+	# for that cell. Costs time in proportion to the number of changes, not the board
+	def getChangesSince(self, version):
+		version = max(version, 0)
+		if version >= self.__VERSION:
+			return []
+
+		entry = bisect.bisect_right(self.__CHANGE_VERSIONS, version) - 1
+		indices = np.concatenate(self.__CHANGES[entry:])[version - self.__CHANGE_VERSIONS[entry]:]
+
+		status = self.__STATUS.ravel()[indices]
+		content = self.__CONTENT.ravel()[indices]
+		isOpen = status == self.__STATUS_VALUE['OPENED']
+		codes = self.__CELL_CODES[np.where(isOpen, content, status + self.__STATUS_OFFSET)].tolist()
+		x, y = np.divmod(indices, self.getBoardWidth())
+		return list(zip(x.tolist(), y.tolist(), codes))
+
 	def getGameSolution(self):
 		if not self.__DEBUG and self.__GAME_STATE == self.__STATE_CODE['PLAYING']:
 			self.__GAME_STATE = self.__STATE_CODE['NOT_PLAYING']
@@ -545,16 +811,11 @@ class Game(MinesweeperFunctions):
 		return values
 
 	def __getBoard(self, code):
-		board = []
-		h = len(self.__BOARD)
-		if h == 0:
+		if self.getBoardHeight() == 0:
 			message = 'Board is not yet initialized. Cannot call display.'
 			raise Exception(message)
-		else:
-			w = len(self.__BOARD[0])
 
-		[board.append([self.__mergeVisible(self.__BOARD[i][j], code) for j in range(w)]) for i in range(h)]
-		return board
+		return self.__CELL_CODES[self.__mergeVisible(code)].tolist()
 
 # Used mainly for testing purposes
 if __name__=='__main__':
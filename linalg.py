@@ -1,114 +1,393 @@
 from functionality import MinesweeperFunctions
-import numpy as np
-import itertools
+import collections
+import fractions
+import math
 import time
-import random
 
 class LinearAlgebraAlgorithm(MinesweeperFunctions):
 
+	# Running counts of the independent groups counted and the states the counting went through
+	__GROUPS = 0
+	__STATES = 0
+
 	def __init__(self):
 		super().__init__('status_off')
+		self.resetCounters()
 
-	def __recursivelyFindGroup(self, board, cell, requirement_cells, fulfillment_cells):
-		covered_neighbors = self._getNeighbors(board, cell, code='COVERED')
-		# base case: no group
-		if len(covered_neighbors) == 0:
-			return [requirement_cells, fulfillment_cells]
+	# Returns the counters kept since the last resetCounters
+	def getCounters(self):
+		return {'GROUPS': self.__GROUPS, 'STATES': self.__STATES}
 
-		# remove covered neighbors that have already been added to the group
-		covered_neighbors = [n for n in covered_neighbors if n not in fulfillment_cells]
+	def resetCounters(self):
+		self.__GROUPS = 0
+		self.__STATES = 0
 
-		# base case: group has been accounted for in this direction
-		if len(covered_neighbors) == 0:
-			return [requirement_cells, fulfillment_cells]
+	# Union-find lookup of the root of i, halving the path on the way
+	def __find(self, parent, i):
+		while parent[i] != i:
+			parent[i] = parent[parent[i]]
+			i = parent[i]
+		return i
 
-		opened_neighbors = []
-		for n in covered_neighbors:
-			opened_neighbors.extend(self._getNeighbors(board, n, code='REALLY_OPENED'))
-		opened_neighbors = [n for n in opened_neighbors if n not in requirement_cells]
+	# Splits the given requirement and fulfillment cells into independent groups: 
+	# the connected parts of the graph where each requirement cell is linked to its
+	# covered neighbors among the fulfillment cells. Uses union-find over the 
+	# fulfillment cells, so it takes one pass over the requirements and no recursion
+	# Groups (and the cells in them) come out in the order the cells were given
+	# Requirement cells that touch none of the fulfillment cells are left out
+	def __splitGroups(self, board, requirement_cells, fulfillment_cells):
+		index = {fc: i for i, fc in enumerate(fulfillment_cells)}
+		parent = list(range(len(fulfillment_cells)))
+		size = [1] * len(fulfillment_cells)
 
-		fulfillment_cells.extend(covered_neighbors)
-		requirement_cells.extend(opened_neighbors)
+		requirement_roots = []
+		for rc in requirement_cells:
+			neighbors = [index[n] for n in self._getAllNeighbors(board, rc) if n in index]
+			for n in neighbors[1:]:
+				a = self.__find(parent, neighbors[0])
+				b = self.__find(parent, n)
+				if a != b:
+					if size[a] < size[b]:
+						a, b = b, a
+					parent[b] = a
+					size[a] = size[a] + size[b]
+			requirement_roots.append(neighbors[0] if len(neighbors) > 0 else None)
 
-		for n in opened_neighbors:
-			requirement_cells, fulfillment_cells = self.__recursivelyFindGroup(board, n, requirement_cells, fulfillment_cells)
+		groups = {}
+		for i, fc in enumerate(fulfillment_cells):
+			groups.setdefault(self.__find(parent, i), [[], []])[1].append(fc)
+		for rc, root in zip(requirement_cells, requirement_roots):
+			if root is not None:
+				groups[self.__find(parent, root)][0].append(rc)
 
-		return (list(set(requirement_cells)), list(set(fulfillment_cells)))
+		return list(groups.values())
 
-	def __findGroup(self, board, cell):
-		return self.__recursivelyFindGroup(board, cell, [], [])
+	# Describes a group as a system of requirements. For each requirement cell, returns the 
+	# indices (into the group's fulfillment cells) of its covered neighbors, and how many 
+	# bombs still need to be among them, starting from its 'REMAINING' in _getFrontier
+	# Cells in forced (a dict of cell: 1 for bomb, 0 for safe) count as already decided
+	def __getRequirements(self, board, group, remaining, forced={}):
+		requirement_cells = group[0]
+		fulfillment_cells = group[1]
 
-	def __getGroups(self, board):
-		# get all requirement cells and fulfillment cells
-		requirement_cells = [(x, y)
-			for x in range(len(board)) 
-			for y in range(len(board[x]))
-			if board[x][y] != self._CODES['COVERED'] 
-			and board[x][y] != self._CODES['FLAGGED'] 
-			and len(self._getNeighbors(board, (x, y), code='COVERED')) > 0]
-		fulfillment_cells = [(x, y)
-			for x in range(len(board)) 
-			for y in range(len(board[x]))
-			if board[x][y] == self._CODES['COVERED'] 
-			and len(self._getNeighbors(board, (x, y), code='REALLY_OPENED')) > 0]
+		index = {fc: i for i, fc in enumerate(fulfillment_cells)}
+		neighbors = [[index[n] for n in self._getNeighbors(board, rc) if n in index]
+			for rc in requirement_cells]
 
-		groups = []
-		while len(requirement_cells) + len(fulfillment_cells) > 0:
-			new_group = self.__findGroup(board, requirement_cells[random.randrange(len(requirement_cells))])
+		goal = []
+		for rc in requirement_cells:
+			value = remaining[rc]
+			if len(forced) > 0:
+				value = value - sum(forced[n] for n in self._getNeighbors(board, rc) if n in forced)
+			goal.append(value)
 
-			requirement_cells = [rc for rc in requirement_cells if rc not in new_group[0]]
-			fulfillment_cells = [fc for fc in fulfillment_cells if fc not in new_group[1]]
+		return (neighbors, goal)
 
-			groups.append(new_group)
+	# Row reduces the requirements with exact integer arithmetic (each row operation
+	# scales rows instead of dividing, and rows are kept small by dividing out their gcd)
+	# Returns the rows that are left, each a list of coefficients followed by the goal
+	def __rowReduce(self, rows, size):
+		rows = [r[:] for r in rows]
+		pivot = 0
+		for column in range(size):
+			found = None
+			for i in range(pivot, len(rows)):
+				if rows[i][column] != 0:
+					found = i
+					break
+			if found is None:
+				continue
 
-		return groups
+			rows[pivot], rows[found] = rows[found], rows[pivot]
+			a = rows[pivot][column]
+			for i in range(len(rows)):
+				c = rows[i][column]
+				if i == pivot or c == 0:
+					continue
+				row = [a * x - c * y for x, y in zip(rows[i], rows[pivot])]
+				divisor = 0
+				for x in row:
+					divisor = math.gcd(divisor, x)
+				rows[i] = [x // divisor for x in row] if divisor > 1 else row
+			pivot = pivot + 1
 
-	def __getSolutions(self, board, bombs, group):
-		requirement_cells = group[0]
-		fulfillment_cells = group[1]
+		return [r for r in rows if any(r)]
 
-		print('requirement_cells (len={}): {}'.format(len(requirement_cells), requirement_cells))
-		print('fulfillment_cells (len={}): {}'.format(len(fulfillment_cells), fulfillment_cells))
+	# Finds the cells of a group that can be decided from the requirements alone, 
+	# before any search. In a row sum(a_i * x_i) = b with every x_i either 0 or 1, 
+	# the left side is at least the sum of the negative a_i and at most the sum of the
+	# positive a_i. If b is equal to one of those bounds, every cell in the row is pinned:
+	#   b == max: cells with a_i > 0 are bombs and cells with a_i < 0 are safe
+	#   b == min: cells with a_i > 0 are safe and cells with a_i < 0 are bombs
+	# The rows are checked both as given and after row reduction, and the decided cells 
+	# are substituted back in until nothing new is found
+	# Returns a dict of index: 1 for bomb, 0 for safe
+	def __reduce(self, neighbors, goal, size):
+		rows = []
+		for r in range(len(neighbors)):
+			row = [0] * (size + 1)
+			for v in neighbors[r]:
+				row[v] = 1
+			row[size] = goal[r]
+			rows.append(row)
 
-		requirements = np.mat([[1 if fc in self._getNeighbors(board, rc) else 0 
-				for fc in fulfillment_cells]
-			for rc in requirement_cells])
-		print('Requirements: \n{}'.format(requirements))
+		forced = {}
+		while True:
+			found = {}
+			for row in rows + self.__rowReduce(rows, size):
+				positive = sum(a for a in row[:size] if a > 0)
+				negative = sum(a for a in row[:size] if a < 0)
+				if row[size] == positive:
+					bomb_sign = 1
+				elif row[size] == negative:
+					bomb_sign = -1
+				else:
+					continue
+				for v in range(size):
+					if row[v] != 0 and v not in forced:
+						found[v] = 1 if (row[v] > 0) == (bomb_sign > 0) else 0
 
-		goal = np.mat([board[c[0]][c[1]] - len(self._getNeighbors(board, c, code='FLAGGED')) 
-			for c in requirement_cells])
-		print('Goal: \n{}'.format(goal))
+			if len(found) == 0:
+				return forced
 
-		# For beginner board with 9 cells to fill, should be 2^9 = 512 possible solutions
-		# https://stackoverflow.com/questions/14931769/how-to-get-all-combination-of-n-binary-value
-		guesses = list(itertools.product([0, 1], repeat=len(fulfillment_cells)))
-		print('Possible Solutions: {}'.format(len(guesses)))
+			# Substitute the decided cells into every row
+			forced.update(found)
+			for row in rows:
+				for v, value in found.items():
+					row[size] = row[size] - row[v] * value
+					row[v] = 0
 
-		solutions = [s for s in guesses
-			if sum(s) <= bombs
-			and np.equal(requirements.dot(np.array(s))[0], goal).all()]
+	# Returns the order to assign the fulfillment cells in: walking from requirement to
+	# requirement through shared cells, starting from the smallest requirement of each
+	# connected part, so that each requirement is completed as early as possible
+	def __getOrder(self, neighbors, constraints_of, size):
+		order = []
+		ordered = [False] * size
+		visited = [False] * len(neighbors)
+		for start in sorted(range(len(neighbors)), key=lambda r: len(neighbors[r])):
+			if visited[start]:
+				continue
+			visited[start] = True
+			queue = collections.deque([start])
+			while len(queue) > 0:
+				r = queue.popleft()
+				for v in neighbors[r]:
+					if not ordered[v]:
+						ordered[v] = True
+						order.append(v)
+					for other in constraints_of[v]:
+						if not visited[other]:
+							visited[other] = True
+							queue.append(other)
+		order.extend(v for v in range(size) if not ordered[v])
+		return order
 
-		print('Correct Solutions: {}\n(First 8...):\n{}'.format(len(solutions), solutions[:8]))
+	# Counts the assignments of 0 (safe) or 1 (bomb) to the fulfillment cells that meet
+	# all of the requirements and use at most the given number of bombs, without going
+	# through the assignments one at a time
+	#
+	# Cells are assigned in the order of __getOrder. Once the first k cells are assigned,
+	# all that matters for the rest is the sums of the requirements that are still open
+	# (those with cells on both sides of k), so the partial assignments with the same
+	# open sums are merged into one state. A state keeps how many partial assignments
+	# it stands for, by number of bombs used, as a dict of bombs: count
+	# A forward pass counts the ways to reach each state and a backward pass the ways to
+	# complete it. A cell is a bomb in forward * backward of the steps that set it to 1
+	#
+	# Returns (counts, cells): counts[m] is the number of assignments that use m bombs,
+	# and cells[i][m] how many of those have a bomb in cell i
+	def __countAssignments(self, neighbors, goal, size, bombs):
+		constraints_of = [[] for i in range(size)]
+		for r in range(len(neighbors)):
+			for v in neighbors[r]:
+				constraints_of[v].append(r)
+		order = self.__getOrder(neighbors, constraints_of, size)
 
-		return solutions
+		position = [0] * size
+		for k, v in enumerate(order):
+			position[v] = k
+		first = [min((position[v] for v in n), default=size) for n in neighbors]
+		last = [max((position[v] for v in n), default=-1) for n in neighbors]
+		# open_at[k] is the requirements still open before the k-th cell is assigned
+		open_at = [[r for r in range(len(neighbors)) if first[r] < k <= last[r]] for k in range(size + 1)]
 
-	def __getSolutionInfo(self, board, bombs, group, solutions):
-		print('Nothing yet')
+		# layers[k] maps each state reached before the k-th cell to its counts,
+		# and steps[k] each of those states to the (value, next state) pairs that fit
+		layers = [{(): {0: 1}}]
+		steps = []
+		for k in range(size):
+			v = order[k]
+			index = {r: i for i, r in enumerate(open_at[k])}
+			# For each requirement of the cell: where its sum is in the state, its goal,
+			# and how many of its cells come after this one
+			checks = [(index.get(r, -1), goal[r], sum(1 for c in neighbors[r] if position[c] > k)) for r in constraints_of[v]]
+			sources = [(index.get(r, -1), r in constraints_of[v]) for r in open_at[k + 1]]
 
-	def solution(self, solver, turn):
+			layer = {}
+			step = {}
+			for state, counts in layers[k].items():
+				step[state] = []
+				for value in (0, 1):
+					fits = True
+					for i, g, after in checks:
+						total = (state[i] if i >= 0 else 0) + value
+						if total > g or total + after < g:
+							fits = False
+							break
+					if not fits:
+						continue
+
+					following = tuple((state[i] if i >= 0 else 0) + (value if touched else 0) for i, touched in sources)
+					step[state].append((value, following))
+					target = layer.setdefault(following, {})
+					for m, c in counts.items():
+						if m + value <= bombs:
+							target[m + value] = target.get(m + value, 0) + c
+			layers.append(layer)
+			steps.append(step)
+			self.__STATES = self.__STATES + len(layer)
+
+		# completions[state] counts the ways to assign the cells from k on, by bombs used
+		completions = {state: {0: 1} for state in layers[size]}
+		cells = [{} for i in range(size)]
+		for k in range(size - 1, -1, -1):
+			v = order[k]
+			previous = {}
+			for state, counts in layers[k].items():
+				ways = {}
+				for value, following in steps[k][state]:
+					for m, c in completions[following].items():
+						if m + value <= bombs:
+							ways[m + value] = ways.get(m + value, 0) + c
+					if value == 1:
+						# Every way to reach this state, with a bomb here and any way to complete the rest
+						for a, x in counts.items():
+							for b, y in completions[following].items():
+								if a + b + 1 <= bombs:
+									cells[v][a + b + 1] = cells[v].get(a + b + 1, 0) + x * y
+				previous[state] = ways
+			completions = previous
+
+		return (completions.get((), {}), cells)
+
+	# Counts the solutions of a group with __countAssignments
+	# Returns a dict keyed by the number of bombs a solution uses, where each value
+	# has 'COUNT', the number of such solutions, and 'CELLS', how many of them have
+	# a bomb in each of the fulfillment cells
+	def __countSolutions(self, board, bombs, group, remaining, forced={}):
+		neighbors, goal = self.__getRequirements(board, group, remaining, forced)
+		bombs = bombs - sum(forced.values())
+		size = len(group[1])
+
+		self.__GROUPS = self.__GROUPS + 1
+		counts, cells = self.__countAssignments(neighbors, goal, size, bombs)
+		return {mines: {'COUNT': counts[mines], 'CELLS': [cells[i].get(mines, 0) for i in range(size)]}
+			for mines in sorted(counts) if counts[mines] > 0}
+
+	# Multiplies two distributions given as lists indexed by number of bombs
+	def __convolve(self, a, b):
+		result = [0] * (len(a) + len(b) - 1)
+		for i in range(len(a)):
+			if a[i] == 0:
+				continue
+			for j in range(len(b)):
+				result[i + j] = result[i + j] + a[i] * b[j]
+		return result
 
-		groups = self.__getGroups(turn['BOARD'])
-		print('Groups: {}'.format(len(groups)))
-		for g in groups:
-			start_time = time.time()
+	# Number of ways to place the bombs not used on the frontier among the interior cells
+	def __weight(self, interior, bombs, mines):
+		if bombs - mines < 0 or bombs - mines > interior:
+			return 0
+		return math.comb(interior, bombs - mines)
+
+	# Splits the frontier into independent parts and counts the solutions of each part
+	# Returns (decided, parts) where decided is a dict of cell: 1 for bomb, 0 for safe
+	# for cells pinned by row reduction, and each part is (fulfillment cells, counts)
+	# with counts as returned by __countSolutions
+	def __countParts(self, board, bombs, frontier):
+		decided = {}
+		parts = []
+		for g in self.__splitGroups(board, frontier['CONSTRAINTS'], frontier['FRONTIER']):
+			neighbors, goal = self.__getRequirements(board, g, frontier['REMAINING'])
+			forced = {g[1][i]: value for i, value in self.__reduce(neighbors, goal, len(g[1])).items()}
+			decided.update(forced)
+
+			# Without the decided cells, the rest of the group may fall apart into smaller groups
+			remaining = [c for c in g[1] if c not in forced]
+			for part in self.__splitGroups(board, g[0], remaining):
+				parts.append((part[1], self.__countSolutions(board, bombs, part, frontier['REMAINING'], forced)))
+		return (decided, parts)
+
+	# Returns a dict with the exact probability (as a Fraction) that each covered cell is a bomb
+	# The solutions of every independent part of the frontier are counted by how many
+	# bombs they use. A way of combining one solution from each part that uses M bombs
+	# in total leaves bombs - M for the covered cells away from the frontier, which
+	# can be placed in C(interior, bombs - M) ways, so it is weighted by that
+	# Only counts are combined, never the solutions themselves
+	# Returns an empty dict if no arrangement fits the number of bombs left
+	def getProbabilities(self, board, bombs):
+		frontier = self._getFrontier(board)
+		interior = len(frontier['INTERIOR'])
+		decided, parts = self.__countParts(board, bombs, frontier)
+		bombs = bombs - sum(decided.values())
+
+		# Distribution of the number of bombs used by each part
+		distributions = []
+		for cells, counts in parts:
+			distribution = [0] * (max(counts) + 1 if len(counts) > 0 else 1)
+			for mines in counts:
+				distribution[mines] = counts[mines]['COUNT']
+			distributions.append(distribution)
+
+		# prefix[k] combines the parts before k and suffix[k] the parts from k on
+		prefix = [[1]]
+		for d in distributions:
+			prefix.append(self.__convolve(prefix[-1], d))
+		suffix = [[1]]
+		for d in reversed(distributions):
+			suffix.append(self.__convolve(suffix[-1], d))
+		suffix.reverse()
+
+		combined = prefix[-1]
+		total = sum(combined[m] * self.__weight(interior, bombs, m) for m in range(len(combined)))
+		if total == 0:
+			return {}
+
+		probabilities = {}
+		for c in decided:
+			probabilities[c] = fractions.Fraction(decided[c])
+
+		for k in range(len(parts)):
+			cells, counts = parts[k]
+			others = self.__convolve(prefix[k], suffix[k + 1])
+			for mines in counts:
+				# Total weight of the ways to complete the board given this part uses this many bombs
+				rest = sum(others[m] * self.__weight(interior, bombs, mines + m) for m in range(len(others)))
+				for i in range(len(cells)):
+					probabilities[cells[i]] = probabilities.get(cells[i], 0) + counts[mines]['CELLS'][i] * rest
+			for c in cells:
+				probabilities[c] = fractions.Fraction(probabilities.get(c, 0), total)
+
+		if interior > 0:
+			expected = sum(combined[m] * self.__weight(interior, bombs, m) * (bombs - m) for m in range(len(combined)))
+			for c in frontier['INTERIOR']:
+				probabilities[c] = fractions.Fraction(expected, total * interior)
+
+		return probabilities
+
+	def solution(self, solver, turn):
+		start_time = time.time()
 
-			print('')
-			print('Next Group...')
+		probabilities = self.getProbabilities(turn['BOARD'], turn['BOMBS'])
+		toOpen = [c for c in probabilities if probabilities[c] == 0]
+		toFlag = [c for c in probabilities if probabilities[c] == 1]
 
-			solutions = self.__getSolutions(turn['BOARD'], turn['BOMBS'], g)
-			self.__getSolutionInfo(turn['BOARD'], turn['BOMBS'], g, solutions)
+		print('Covered cells: {}'.format(len(probabilities)))
+		print('Decided: {} to open, {} to flag'.format(len(toOpen), len(toFlag)))
+		if len(probabilities) > 0:
+			print('Lowest chance of a bomb: {0:.4f}'.format(float(min(probabilities.values()))))
 
-			end_time = time.time()
-			print('Time taken: {}'.format(end_time - start_time))
+		end_time = time.time()
+		print('Time taken: {}'.format(end_time - start_time))
 
-		return [],[]
+		return toOpen, toFlag
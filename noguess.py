@@ -0,0 +1,171 @@
+"""
+Basic usage:
+`python3`
+`from noguess import *`
+`generator = NoGuessGenerator(options={'CACHE_DIR': 'boards', 'SEED': 0})`
+`game, firstClick = generator.getGames(1, level='EXPERT')[0]`
+`game.open(*firstClick)`
+"""
+
+import os
+import numpy as np
+from corpus import BoardCorpus
+from factory import BoardFactory
+from functionality import MinesweeperFunctions
+from game import Game
+from recursive import RecursiveAlgorithm
+
+"""
+Public members:
+
+__init__(options=None)
+isNoGuess(content, firstClick)
+generate(howMany, level='BEGINNER', specs={}, firstClick=None)
+getCacheSize(level='BEGINNER', specs={})
+getGames(howMany, level='BEGINNER', specs={}, firstClick=None)
+"""
+# Makes boards that can be solved from their first click without ever guessing
+# Candidates come from BoardFactory in batches, and each one is played with the
+# deductions of the RecursiveAlgorithm alone: a board passes only if they win it
+#
+# Boards that passed can be kept on disk, in one BoardCorpus per board size and bomb count,
+# so that asking for no-guess boards again only reads them back
+class NoGuessGenerator(MinesweeperFunctions):
+	# options
+	__CACHE_DIR = None
+	__SEED = None
+	# Number of candidates made at once
+	__BATCH = 64
+	# Most candidates tried for each board asked for before generate gives up,
+	# or None to keep trying
+	__MAX_ATTEMPTS = 1000
+
+	__FACTORY = None
+	__RANDOM = None
+	__RECURSIVE_SOLVER = None
+
+	def __init__(self, options=None):
+		super().__init__('status_off')
+
+		if options is not None:
+			if 'CACHE_DIR' in options:
+				self.__CACHE_DIR = options['CACHE_DIR']
+			if 'SEED' in options:
+				self.__SEED = options['SEED']
+			if 'BATCH' in options:
+				self.__BATCH = options['BATCH']
+			if 'MAX_ATTEMPTS' in options:
+				self.__MAX_ATTEMPTS = options['MAX_ATTEMPTS']
+
+		self.__FACTORY = BoardFactory(options={'SEED': self.__SEED})
+		self.__RANDOM = np.random.default_rng(self.__SEED)
+		self.__RECURSIVE_SOLVER = RecursiveAlgorithm()
+
+	# Returns True if the board can be won from the given first click without guessing
+	# Each loop tests every frontier cell with the RecursiveAlgorithm, like the Solver
+	# does before it escalates, and makes all the moves found at once. The board fails
+	# at the first loop that finds nothing new
+	def isNoGuess(self, content, firstClick):
+		game = Game(options={'SILENT': True, 'SEED': 0})
+		game.loadBoard(content)
+		if game.open(firstClick[0], firstClick[1]) == True:
+			return True
+
+		board = game.getGameVisible()['BOARD']
+		version = game.getVersion()
+		while True:
+			bombs = game.getBombsLeft()
+			toOpen = set()
+			toFlag = set()
+			for c in self._getFrontier(board)['FRONTIER']:
+				if c in toOpen or c in toFlag:
+					continue
+				canFlag = self.__RECURSIVE_SOLVER.canIFlagThis(board, bombs, c)
+				canOpen = self.__RECURSIVE_SOLVER.canIOpenThis(board, bombs, c)
+				if canFlag and canOpen:
+					toOpen.update(o for o in canFlag[0] if o in canOpen[0])
+					toFlag.update(o for o in canFlag[1] if o in canOpen[1])
+				elif not canFlag:
+					toOpen.update(canOpen[0])
+					toFlag.update(canOpen[1])
+				elif not canOpen:
+					toOpen.update(canFlag[0])
+					toFlag.update(canFlag[1])
+
+			if len(toOpen) == 0 and len(toFlag) == 0:
+				return False
+			for c in toFlag:
+				game.flag(c[0], c[1])
+			for c in toOpen:
+				result = game.open(c[0], c[1])
+				if result is not None:
+					return result
+
+			# Bring the board up to date with only the cells that changed
+			for x, y, code in game.getChangesSince(version):
+				board[x][y] = code
+			version = game.getVersion()
+
+	# Makes howMany new no-guess boards (without using or filling the cache)
+	# Returns (contents, clicks) as in BoardFactory.makeContents
+	# Raises a ValueError if the bombs do not fit away from the first click, or if
+	# MAX_ATTEMPTS * howMany candidates were tried without finding enough boards
+	def generate(self, howMany, level='BEGINNER', specs={}, firstClick=None):
+		h, w, b = self.__FACTORY.getSize(level, specs)
+		if b > h * w - self.__FACTORY.getZoneSize(h, w, firstClick):
+			raise ValueError('Invalid parameters: can not fit {} bombs on a board of size {}x{} away from the first click'.format(b,h,w))
+		contents = np.zeros((howMany, h, w), dtype=np.int8)
+		clicks = np.zeros((howMany, 2), dtype=np.int64)
+
+		found = 0
+		attempts = 0
+		while found < howMany:
+			if self.__MAX_ATTEMPTS is not None and attempts >= self.__MAX_ATTEMPTS * howMany:
+				raise ValueError('Could not find {} no-guess boards of size {}x{} with {} bombs in {} attempts'.format(howMany,h,w,b,attempts))
+			candidates, candidateClicks = self.__FACTORY.makeContents(self.__BATCH, level, specs, firstClick)
+			for i in range(self.__BATCH):
+				attempts = attempts + 1
+				if self.isNoGuess(candidates[i], candidateClicks[i].tolist()):
+					contents[found] = candidates[i]
+					clicks[found] = candidateClicks[i]
+					found = found + 1
+					if found == howMany:
+						break
+
+		return (contents, clicks)
+
+	# Returns the corpus of cached boards of the given size, or None without a CACHE_DIR
+	def __getCache(self, h, w, b):
+		if self.__CACHE_DIR is None:
+			return None
+		os.makedirs(self.__CACHE_DIR, exist_ok=True)
+		path = os.path.join(self.__CACHE_DIR, '{}x{}-{}.corpus'.format(h, w, b))
+		return BoardCorpus(path, options={'HEIGHT': h, 'WIDTH': w})
+
+	def getCacheSize(self, level='BEGINNER', specs={}):
+		cache = self.__getCache(*self.__FACTORY.getSize(level, specs))
+		return 0 if cache is None else cache.getSize()
+
+	# Returns a list of (game, (x, y)) for howMany no-guess games, ready to play,
+	# with (x, y) the first click to open. The boards are picked at random from the cache,
+	# and only the boards the cache is missing are generated (and then added to it)
+	# With firstClick given, or without a CACHE_DIR, every board is generated
+	def getGames(self, howMany, level='BEGINNER', specs={}, firstClick=None):
+		h, w, b = self.__FACTORY.getSize(level, specs)
+
+		if firstClick is not None or self.__CACHE_DIR is None:
+			contents, clicks = self.generate(howMany, level, specs, firstClick)
+		else:
+			cache = self.__getCache(h, w, b)
+			if cache.getSize() < howMany:
+				cache.appendContents(*self.generate(howMany - cache.getSize(), level, specs))
+
+			chosen = self.__RANDOM.choice(cache.getSize(), size=howMany, replace=False)
+			contents, clicks = cache.getContents(chosen)
+
+		games = []
+		for i in range(howMany):
+			game = Game(options={'SILENT': True, 'SEED': int(self.__RANDOM.integers(100000))})
+			game.loadBoard(contents[i])
+			games.append((game, tuple(clicks[i].tolist())))
+		return games
@@ -1,126 +1,160 @@
-import copy
+import collections
 from functionality import MinesweeperFunctions
 
 class RecursiveAlgorithm(MinesweeperFunctions):
+	# Running count of the constraint checks made by __propagate
+	__STEPS = 0
+
 	def __init__(self):
 		super().__init__('status_off')
-
-	def __checkFulfillment(self, board, bombs, influencedCells, modifiedCells):
-		toOpen = []
-		toFlag = []
-
-		# TODO --- IMPROVE ALGORITHM
-		# if bombs is zero, open everything covered on the whole board
-
-		# Check for negative base case
-		if bombs < 0:
-			return False
-
-		for i in influencedCells:
-			neighbors = self._getNeighbors(board, i)
-			nbsFlagged = self._filterCells(board, neighbors, 'FLAGGED')
-			nbsCovered = self._filterCells(board, neighbors, 'COVERED')
-			nbsOpened = self._filterCells(board, neighbors, 'OPENED')
+		self.resetCounters()
+
+	# Returns the counters kept since the last resetCounters
+	def getCounters(self):
+		return {'RECURSION_STEPS': self.__STEPS}
+
+	def resetCounters(self):
+		self.__STEPS = 0
+
+	# Changes the given cells on the board to the given code, recording their old values
+	# in the undo log so that the board can be put back afterwards with __rollback
+	def __assume(self, board, cells, code, undo):
+		for c in cells:
+			undo.append((c, board[c[0]][c[1]]))
+			board[c[0]][c[1]] = self._CODES[code]
+
+	def __rollback(self, board, undo):
+		while len(undo) > 0:
+			c, value = undo.pop()
+			board[c[0]][c[1]] = value
+
+	# Opened cells showing a number (or empty) constrain their neighbors.
+	# Cells that are covered, flagged, or only opened hypothetically do not
+	def __isConstraint(self, value):
+		return value != self._CODES['COVERED'] and value != self._CODES['FLAGGED'] and value != self._CODES['OPENED']
+
+	# Returns the counters for a constraint cell: [covered neighbors, flagged neighbors]
+	def __countAround(self, board, cell):
+		counters = [0, 0]
+		for n in self._getAllNeighbors(board, cell):
+			value = board[n[0]][n[1]]
+			if value == self._CODES['COVERED']:
+				counters[0] = counters[0] + 1
+			elif value == self._CODES['FLAGGED']:
+				counters[1] = counters[1] + 1
+		return counters
+
+	# Propagation engine behind both tests. Makes the given change to the board,
+	# then follows everything that the numbers around it force, one step at a time:
+	#   - Every constraint cell touched so far keeps counters of its covered and flagged neighbors
+	#   - Whenever a cell is opened or flagged, the counters around it are updated and those
+	#     constraint cells are put on the worklist to be checked again
+	#   - Checking a constraint only looks at its counters:
+	#     too many flags or too few covered cells left means the change was impossible,
+	#     all bombs flagged means the rest can be opened, and exactly enough covered
+	#     cells left means they can all be flagged
+	# Nothing is checked twice unless its counters changed, and there is no recursion
+	#
+	# Returns False if the change leads to a contradiction. Otherwise returns a list of
+	# two lists: the cells that would be opened and the cells that would be flagged
+	# (including the given cell)
+	# If region is a set, every cell whose value the engine looked at is added to it
+	def __propagate(self, board, bombs, cell, code, undo, region=None):
+		counters = {}
+		worklist = collections.deque()
+		queued = set()
+		modified = {'OPENED': [], 'FLAGGED': []}
+		pending = [(cell, code)]
+
+		while len(pending) > 0 or len(worklist) > 0:
+			# Make the pending changes and update the counters around them
+			while len(pending) > 0:
+				c, code = pending.pop()
+				if board[c[0]][c[1]] != self._CODES['COVERED']:
+					continue
+
+				self.__assume(board, [c], code, undo)
+				modified[code].append(c)
+				if region is not None:
+					region.add(c)
+					region.update(self._getAllNeighbors(board, c))
+				if code == 'FLAGGED':
+					bombs = bombs - 1
+					if bombs < 0:
+						return False
+
+				for n in self._getAllNeighbors(board, c):
+					if not self.__isConstraint(board[n[0]][n[1]]):
+						continue
+					if n in counters:
+						counters[n][0] = counters[n][0] - 1
+						if code == 'FLAGGED':
+							counters[n][1] = counters[n][1] + 1
+					else:
+						counters[n] = self.__countAround(board, n)
+						if region is not None:
+							region.update(self._getAllNeighbors(board, n))
+					if n not in queued:
+						queued.add(n)
+						worklist.append(n)
+
+			if len(worklist) == 0:
+				break
+
+			# Check the next constraint whose counters changed
+			i = worklist.popleft()
+			queued.discard(i)
+			self.__STEPS = self.__STEPS + 1
+			covered, flagged = counters[i]
 
 			value = board[i[0]][i[1]]
 			value = int(value) if type(value) == type(0) else 0
 
-			# Too many flags around a cell
-			if len(nbsFlagged) > value:
+			# Too many flags around a cell, or too many opened around a cell
+			if flagged > value or flagged + covered < value:
 				return False
+			elif covered == 0:
+				continue
 			# Completely fulfilled; open remaining neighbors
-			elif len(nbsFlagged) == value:
-				toOpen.extend(nbsCovered)
+			elif flagged == value:
+				newCode = 'OPENED'
+			# Will be fulfilled; flag remaining neighbors
+			elif flagged + covered == value:
+				newCode = 'FLAGGED'
+			# Not yet fulfilled; keep going
 			else:
-				# Not yet fulfilled; keep going
-				if len(nbsFlagged) + len(nbsCovered) > value:
-					pass
-				# Too many opened around a cell
-				elif len(nbsFlagged) + len(nbsCovered) < value:
-					return False
-				# Will be fulfilled; flag remaining neighbors
-				else:
-					toFlag.extend(nbsCovered)
-
-		return [toOpen, toFlag]
-
-
-	def __recursiveSolution(self, board, bombs, influencedCells, modifiedCells):
-		# Is this board still possible to fulfill?
-		check = self.__checkFulfillment(board, bombs, influencedCells, modifiedCells)
-
-		# Failed the check for fulfillment (negative base case)
-		if not check:
-			return False
-
-		# If check is not false, it will contain one list of toOpen and one list of toFlag
-		toOpen = list(set(check[0]))
-		toFlag = list(set(check[1]))
-
-		# Check for positive base case
-		if len(toOpen) == 0 and len(toFlag) == 0:
-			toReturn = []
-			toReturn.append([c for c in modifiedCells if board[c[0]][c[1]] == self._CODES['OPENED']])
-			toReturn.append([c for c in modifiedCells if board[c[0]][c[1]] == self._CODES['FLAGGED']])
-
-			"""
-			# - - - <- this should be opened
-			# 3 2 -
-			3 4 3 -
-			# # # 2
-
-			However, this would cause a crazy amount of recursion in the general case
-			Instead, we will simply allow the general case algorithm to run its course 
-			until it gets stuck, then switch to probability-based solution
-			"""
-
-			return toReturn
-
-		# Failed a check for sanity: the same cell should not be marked toOpen and toFlag
-		if len([e for e in toOpen if e in toFlag]) > 0:
-			return False
+				continue
+
+			pending.extend((n, newCode) for n in self._getAllNeighbors(board, i)
+				if board[n[0]][n[1]] == self._CODES['COVERED'])
 
 		"""
-		BEYOND THE POINT OF NO RETURN (prepare to recurse)
-		
-		We need a new list of modified cells, and an updated test board
-		We also need to add new influenced cells based on the neighbors of the recently added modified cells
+		# - - - <- this should be opened
+		# 3 2 -
+		3 4 3 -
+		# # # 2
+
+		However, this would need case analysis over several cells at once in the general case
+		Instead, we will simply allow the general case algorithm to run its course
+		until it gets stuck, then switch to probability-based solution
 		"""
 
-		nbsOfToOpen = []
-		for c in toOpen:
-			board[c[0]][c[1]] = self._CODES['OPENED']
-			nbsOfToOpen.extend(self._getNeighbors(board, c, code='REALLY_OPENED'))
-		modifiedCells.extend(toOpen)
-		influencedCells.extend(nbsOfToOpen)
-
-		nbsOfToFlag = []
-		for c in toFlag:
-			board[c[0]][c[1]] = self._CODES['FLAGGED']
-			nbsOfToFlag.extend(self._getNeighbors(board, c, code='REALLY_OPENED'))
-			bombs = bombs - 1
-		modifiedCells.extend(toFlag)
-		influencedCells.extend(nbsOfToFlag)
-
-		modifiedCells = list(set(modifiedCells))
-		influencedCells = list(set(influencedCells))
-
-		return self.__recursiveSolution(board, bombs, influencedCells, modifiedCells)
-
-	def canIFlagThis(self, board, bombs, cell):
-		testBoard = copy.deepcopy(board)
-		testBoard[cell[0]][cell[1]] = self._CODES['FLAGGED']
-		modifiedCells = [cell]
-
-		influencedCells = self._getNeighbors(board, cell, code='REALLY_OPENED')
-
-		return self.__recursiveSolution(testBoard, bombs - 1, influencedCells, modifiedCells)
-
-	def canIOpenThis(self, board, bombs, cell):
-		testBoard = copy.deepcopy(board)
-		testBoard[cell[0]][cell[1]] = self._CODES['OPENED']
-		modifiedCells = [cell]
-
-		influencedCells = self._getNeighbors(board, cell, code='REALLY_OPENED')
-
-		return self.__recursiveSolution(testBoard, bombs, influencedCells, modifiedCells)
+		return [modified['OPENED'], modified['FLAGGED']]
+
+	# Both tests work directly on the given board instead of a copy of it.
+	# Every hypothetical change goes into an undo log, and the board is always
+	# rolled back to how it was before returning
+	# Pass a set as region to collect the cells that the result depends on
+	def canIFlagThis(self, board, bombs, cell, region=None):
+		undo = []
+		try:
+			return self.__propagate(board, bombs, cell, 'FLAGGED', undo, region)
+		finally:
+			self.__rollback(board, undo)
+
+	def canIOpenThis(self, board, bombs, cell, region=None):
+		undo = []
+		try:
+			return self.__propagate(board, bombs, cell, 'OPENED', undo, region)
+		finally:
+			self.__rollback(board, undo)
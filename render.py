@@ -0,0 +1,200 @@
+"""
+Basic usage:
+`python3`
+`from game import *`
+`from render import *`
+`renderer = ConsoleRenderer(options={'FPS': 30})`
+`mygame = Game(options={'RENDERER': renderer})`
+`mygame.populateBoard(level='EXPERT')`
+`mygame.open(0, 0)`
+`renderer.close()`
+"""
+
+import shutil
+import sys
+import time
+from functionality import MinesweeperFunctions
+
+"""
+Public members:
+
+__init__(options=None)
+render(game, force=False)
+flush()
+invalidate()
+close()
+"""
+# Draws games to the console like Game.consoleDisplayVisible, but fast enough
+# to show every move of a game on a big board
+#
+# Every frame is built in one buffer and written with a single write. After the
+# first frame, only the cells (and the time and bombs left) that changed since
+# the frame on the screen are drawn again, by moving the cursor to them with ANSI
+# escape codes. The frame stays at the top of the screen, and anything else printed
+# scrolls in the lines below it, so it can be printed to in between frames
+#
+# At most FPS frames are drawn per second. Moves made in between are not drawn on
+# their own: the next frame shows all of them at once. The last of them is only drawn
+# on the next call to render (or flush), so call flush (or close) when done
+class ConsoleRenderer(MinesweeperFunctions):
+	# ANSI escape codes
+	__SAVE_CURSOR = '\x1b7'
+	__RESTORE_CURSOR = '\x1b8'
+	__CLEAR_SCREEN = '\x1b[H\x1b[2J'
+	__CLEAR_LINE = '\x1b[K'
+	__RESET_SCROLL = '\x1b[r'
+	# Rows and columns start at 1
+	__MOVE_CURSOR = '\x1b[{};{}H'
+	__SET_SCROLL = '\x1b[{};{}r'
+
+	# options
+	# Most frames drawn per second, or None for no limit
+	__FPS = 30
+	__PRINT_GUIDES = True
+	# Stream to draw to, sys.stdout by default
+	__STREAM = None
+	# Whether to draw only what changed using ANSI escape codes. By default only
+	# when the stream is a terminal, otherwise every frame is written out in full
+	__ANSI = None
+
+	# perf_counter time of the last frame drawn
+	__LAST_FRAME = None
+	# The game whose last moves have not been drawn yet
+	__PENDING = None
+	# What is on the screen: the game, the size of its board, the version of the game
+	# (see Game.getVersion) and its time and bombs left lines
+	# With no frame on the screen (or a frame that can not be drawn over),
+	# __FRAME_LINES is 0 and the next frame is drawn in full
+	__SHOWN_GAME = None
+	__SHOWN_SHAPE = None
+	__SHOWN_VERSION = 0
+	__SHOWN_INFO = None
+	__FRAME_LINES = 0
+
+	def __init__(self, options=None):
+		super().__init__('status_on')
+
+		if options is not None:
+			if 'FPS' in options:
+				self.__FPS = options['FPS']
+			if 'PRINT_GUIDES' in options:
+				self.__PRINT_GUIDES = options['PRINT_GUIDES']
+			if 'STREAM' in options:
+				self.__STREAM = options['STREAM']
+			if 'ANSI' in options:
+				self.__ANSI = options['ANSI']
+
+		if self.__STREAM is None:
+			self.__STREAM = sys.stdout
+		if self.__ANSI is None:
+			self.__ANSI = hasattr(self.__STREAM, 'isatty') and self.__STREAM.isatty()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	# Draws the visible board of the game, unless a frame was drawn less than 1 / FPS
+	# seconds ago, in which case it is left for the next frame. With force=True it is always drawn
+	# Returns True if a frame was drawn
+	def render(self, game, force=False):
+		now = time.perf_counter()
+		if not force and self.__FPS and self.__LAST_FRAME is not None and now - self.__LAST_FRAME < 1 / self.__FPS:
+			self.__PENDING = game
+			return False
+
+		self.__draw(game)
+		self.__LAST_FRAME = now
+		return True
+
+	# Draws the moves that were left for the next frame, if any
+	def flush(self):
+		if self.__PENDING is not None:
+			self.__draw(self.__PENDING)
+			self.__LAST_FRAME = time.perf_counter()
+
+	# Makes the next frame be drawn in full, e.g. after the screen was cleared
+	# or after the game started over with a new change log (see Game.getChangesSince)
+	def invalidate(self):
+		self.__FRAME_LINES = 0
+
+	# Draws what is left and gives the whole screen back for scrolling
+	def close(self):
+		self.flush()
+		if self.__ANSI and self.__FRAME_LINES > 0:
+			self.__write(self.__SAVE_CURSOR + self.__RESET_SCROLL + self.__RESTORE_CURSOR)
+		self.__FRAME_LINES = 0
+		self.__SHOWN_GAME = None
+
+	def __write(self, text):
+		self.__STREAM.write(text)
+		self.__STREAM.flush()
+
+	def __draw(self, game):
+		self.__PENDING = None
+		shape = (game.getBoardHeight(), game.getBoardWidth())
+		info = [
+			self._formatInfo('Time: {0:.2f}'.format(game.getTimeElapsed()), shape[1], self.__PRINT_GUIDES),
+			self._formatInfo('Bombs left: {}'.format(game.getBombsLeft()), shape[1], self.__PRINT_GUIDES),
+		]
+
+		if (not self.__ANSI or self.__FRAME_LINES == 0 or game is not self.__SHOWN_GAME
+				or shape != self.__SHOWN_SHAPE or game.getVersion() < self.__SHOWN_VERSION):
+			self.__drawFull(game)
+		else:
+			self.__drawChanges(game.getChangesSince(self.__SHOWN_VERSION), info)
+
+		self.__SHOWN_GAME = game
+		self.__SHOWN_SHAPE = shape
+		self.__SHOWN_VERSION = game.getVersion()
+		self.__SHOWN_INFO = info
+
+	def __drawFull(self, game):
+		visible = game.getGameVisible()
+		lines = self._formatBoard(visible['BOARD'], visible['TIME'], visible['BOMBS'], self.__PRINT_GUIDES)
+		if not self.__ANSI:
+			self.__write('\n'.join(lines) + '\n')
+			return
+
+		# Keep the frame at the top of the screen by letting only the lines below it scroll
+		# If the screen is too small for that, the frame is drawn in full every time
+		rows = shutil.get_terminal_size().lines
+		buffer = [self.__RESET_SCROLL, self.__CLEAR_SCREEN, '\n'.join(lines), '\n']
+		if rows > len(lines) + 1:
+			buffer.append(self.__SET_SCROLL.format(len(lines) + 1, rows))
+			buffer.append(self.__MOVE_CURSOR.format(len(lines) + 1, 1))
+			self.__FRAME_LINES = len(lines)
+		else:
+			self.__FRAME_LINES = 0
+		self.__write(''.join(buffer))
+
+	# Draws over the frame on the screen, given the changes of Game.getChangesSince
+	# Every run of changed cells next to each other in a row takes one cursor move
+	def __drawChanges(self, changes, info):
+		buffer = [self.__SAVE_CURSOR]
+
+		lines = (self._DISPLAY_TIME_LINE, self._DISPLAY_BOMBS_LINE)
+		for line, text, shown in zip(lines, info, self.__SHOWN_INFO):
+			if text != shown:
+				buffer.append(self.__MOVE_CURSOR.format(line + 1, 1) + text + self.__CLEAR_LINE)
+
+		# A cell may have changed more than once, only its last code is drawn
+		cells = {(x, y): code for x, y, code in changes}
+		run = []
+		for x, y in sorted(cells):
+			if len(run) > 0 and (x, y - len(run)) != run[0]:
+				self.__drawRun(buffer, run, cells)
+				run = []
+			run.append((x, y))
+		if len(run) > 0:
+			self.__drawRun(buffer, run, cells)
+
+		buffer.append(self.__RESTORE_CURSOR)
+		if len(buffer) > 2:
+			self.__write(''.join(buffer))
+
+	def __drawRun(self, buffer, run, cells):
+		x, y = run[0]
+		buffer.append(self.__MOVE_CURSOR.format(self._DISPLAY_BOARD_LINE + x + 1, self._displayColumn(y, self.__PRINT_GUIDES) + 1))
+		buffer.append(' '.join(str(cells[c]) for c in run))
@@ -0,0 +1,197 @@
+"""
+Basic usage:
+`python3`
+`from results import *`
+`sink = ResultSink('results.jsonl')`
+`sink.write(ResultSink.makeRecord(solver.getData(), gameSeed, startSeed))`
+`sink.close()`
+`ResultSink.readStats('results.jsonl').printStats()`
+"""
+
+import csv
+import json
+import os
+
+"""
+Public members:
+
+FIELDS
+makeRecord(data, gameSeed=None, startSeed=None, index=None) # static
+readRecords(path, format=None) # static
+readStats(path, format=None) # static
+__init__(path, options=None)
+write(record)
+close()
+getStats()
+"""
+class ResultSink:
+	# Every record has these fields, in this order (the order of the CSV columns)
+	FIELDS = [
+		'INDEX',
+		'GAME_SEED',
+		'START_SEED',
+		'HEIGHT',
+		'WIDTH',
+		'BOMBS',
+		'RESULT',
+		'LOOPS',
+		'TIME',
+		'BOMBS_LEFT',
+		'STILL_COVERED',
+	]
+
+	__FORMAT_CODE = {
+		'JSONL': 0,
+		'CSV': 1,
+	}
+
+	# options
+	__FORMAT = __FORMAT_CODE['JSONL']
+
+	__PATH = None
+	__FILE = None
+	__WRITER = None
+	__STATS = None
+
+	# Opens path for appending. Records already in the file are kept,
+	# and a CSV header is only written to a new (or empty) file
+	# The format defaults to CSV for paths ending in .csv, and JSONL otherwise
+	def __init__(self, path, options=None):
+		self.__PATH = path
+		self.__FORMAT = self.__FORMAT_CODE[self.__guessFormat(path)]
+
+		if options is not None:
+			if 'FORMAT' in options:
+				self.__FORMAT = self.__FORMAT_CODE[options['FORMAT']]
+
+		self.__STATS = ResultStats()
+
+		isNew = not os.path.exists(path) or os.path.getsize(path) == 0
+		# Line buffered, so that every finished game is on disk even if the run crashes
+		self.__FILE = open(path, 'a', newline='', buffering=1)
+		if self.__FORMAT == self.__FORMAT_CODE['CSV']:
+			self.__WRITER = csv.DictWriter(self.__FILE, fieldnames=self.FIELDS, lineterminator='\n')
+			if isNew:
+				self.__WRITER.writeheader()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	@staticmethod
+	def __guessFormat(path):
+		return 'CSV' if str(path).lower().endswith('.csv') else 'JSONL'
+
+	# Builds the compact record for one game out of Solver.getData()
+	# Only the final loop is kept: the full loop list and the solution board are left out
+	@staticmethod
+	def makeRecord(data, gameSeed=None, startSeed=None, index=None):
+		last = data['LOOP'][-1]
+		return {
+			'INDEX': index,
+			'GAME_SEED': gameSeed,
+			'START_SEED': startSeed,
+			'HEIGHT': data['GAME']['CELL_COUNT']['HEIGHT'],
+			'WIDTH': data['GAME']['CELL_COUNT']['WIDTH'],
+			'BOMBS': data['GAME']['CELL_COUNT']['BOMBS'],
+			'RESULT': data['GAME']['RESULT'],
+			'LOOPS': data['GAME']['LOOP_COUNT'],
+			'TIME': float(last['TIME_ELAPSED']),
+			'BOMBS_LEFT': last['BOMBS_LEFT'],
+			'STILL_COVERED': last['STILL_COVERED'],
+		}
+
+	def write(self, record):
+		if self.__FORMAT == self.__FORMAT_CODE['CSV']:
+			self.__WRITER.writerow(record)
+		else:
+			self.__FILE.write(json.dumps(record, separators=(',', ':')) + '\n')
+		self.__STATS.add(record)
+
+	def close(self):
+		if self.__FILE is not None:
+			self.__FILE.close()
+			self.__FILE = None
+
+	# Stats of the records written through this sink (not those already in the file)
+	def getStats(self):
+		return self.__STATS
+
+	# Reads the records of a file back one at a time
+	@staticmethod
+	def readRecords(path, format=None):
+		format = ResultSink.__guessFormat(path) if format is None else format
+		with open(path, newline='') as f:
+			if format == 'CSV':
+				for row in csv.DictReader(f):
+					yield {k: ResultSink.__parseField(k, v) for k, v in row.items()}
+			else:
+				for line in f:
+					if line.strip() != '':
+						yield json.loads(line)
+
+	@staticmethod
+	def __parseField(key, value):
+		if value == '':
+			return None
+		return float(value) if key == 'TIME' else int(value)
+
+	# Stats of every record in a file, in one pass
+	@staticmethod
+	def readStats(path, format=None):
+		stats = ResultStats()
+		for record in ResultSink.readRecords(path, format):
+			stats.add(record)
+		return stats
+
+"""
+Public members:
+
+__init__()
+add(record)
+printStats()
+"""
+# Running totals over game records, so that stats over any number of games
+# take the same (constant) amount of memory
+class ResultStats:
+	# The RESULT code of a won game, as in Solver.RESULT_CODE
+	__WIN = 1
+
+	__TOTALS = None
+
+	def __init__(self):
+		self.__TOTALS = {
+			'WON': {'COUNT': 0, 'EXPLORED': 0.0, 'TIME': 0.0},
+			'NOT_WON': {'COUNT': 0, 'EXPLORED': 0.0, 'TIME': 0.0},
+		}
+
+	def add(self, record):
+		totals = self.__TOTALS['WON' if record['RESULT'] == self.__WIN else 'NOT_WON']
+		totals['COUNT'] = totals['COUNT'] + 1
+		totals['EXPLORED'] = totals['EXPLORED'] + 1 - (record['STILL_COVERED'] / (record['HEIGHT'] * record['WIDTH']))
+		totals['TIME'] = totals['TIME'] + record['TIME']
+
+	def printStats(self):
+		won = self.__TOTALS['WON']
+		lost = self.__TOTALS['NOT_WON']
+		wins = won['COUNT']
+		total = won['COUNT'] + lost['COUNT']
+
+		if total == 0:
+			print('No data collected')
+			return
+
+		print('')
+		print('Wins: {0}/{1} ({2:.2f}%)'.format(wins, total, 100 * wins / total))
+		print('Average exploration: {0:.2f}%'.format(100 * (won['EXPLORED'] + lost['EXPLORED']) / total))
+		print('Average time: {0:.2f}'.format((won['TIME'] + lost['TIME']) / total))
+		if wins < total:
+			print('--- For lost boards only: ')
+			print('Average exploration: {0:.2f}%'.format(100 * lost['EXPLORED'] / (total - wins)))
+			print('Average time: {0:.2f}'.format(lost['TIME'] / (total - wins)))
+		if wins > 0:
+			print('--- For won boards only: ')
+			print('Average exploration: {0:.2f}%'.format(100 * won['EXPLORED'] / wins))
+			print('Average time: {0:.2f}'.format(won['TIME'] / wins))
@@ -11,9 +11,13 @@
 
 from game import *
 from ai import *
+from results import *
+from render import *
 import time
 import copy
 import random
+import os
+import concurrent.futures
 
 def new_game(silent=False, options=None, level='BEGINNER', specs={}):
 	if not silent:
@@ -40,11 +44,11 @@ def start_game(silent=False, startSeed=None, startPosition=None, options=None, l
 	g = new_game(silent=silent, options=options, level=level, specs=specs)
 
 	mySeed = random.randrange(100000) if startSeed is None else startSeed
-	random.seed(mySeed)
+	start = random.Random(mySeed)
 	h = g.getBoardHeight()
 	w = g.getBoardWidth()
-	x = random.randrange(h) if startPosition is None else startPosition[0]
-	y = random.randrange(w) if startPosition is None else startPosition[1]
+	x = start.randrange(h) if startPosition is None else startPosition[0]
+	y = start.randrange(w) if startPosition is None else startPosition[1]
 
 	if not silent:
 		print('Starting game with seed = {}'.format(mySeed))
@@ -55,63 +59,113 @@ def start_game(silent=False, startSeed=None, startPosition=None, options=None, l
 	return (g, mySeed)
 
 def printStats(data):
-	if len(data) == 0:
-		print('No data collected')
-		return
-
-	results = []
-	for d in range(len(data)):
-		results.append({})
-		results[d]['RESULT'] = data[d]['solver']['GAME']['RESULT'] == Solver.RESULT_CODE['WIN']
-		results[d]['STILL_COVERED'] = data[d]['solver']['LOOP'][-1]['STILL_COVERED']
-		results[d]['PERCENT_EXPLORED'] = 1 - (results[d]['STILL_COVERED'] / data[d]['solver']['GAME']['CELL_COUNT']['TOTAL'])
-		results[d]['TIME'] = float(data[d]['solver']['LOOP'][-1]['TIME_ELAPSED'])
-
-	wins = len([w for w in results if w['RESULT'] == Solver.RESULT_CODE['WIN']])
-	total = len(data)
-
-	print('')
-	print('Wins: {0}/{1} ({2:.2f}%)'.format(wins, total, 100 * wins / total))
-	print('Average exploration: {0:.2f}%'.format(100 * sum(r['PERCENT_EXPLORED'] for r in results) / total))
-	print('Average time: {0:.2f}'.format(sum([r['TIME'] for r in results]) / total))
-	if wins < total:
-		print('--- For lost boards only: ')
-		print('Average exploration: {0:.2f}%'.format(100 * sum(r['PERCENT_EXPLORED'] for r in results if r['RESULT'] != Solver.RESULT_CODE['WIN']) / (total - wins)))
-		print('Average time: {0:.2f}'.format(sum([r['TIME'] for r in results if r['RESULT'] != Solver.RESULT_CODE['WIN']]) / (total - wins)))
-	if wins > 0:
-		print('--- For won boards only: ')
-		print('Average exploration: {0:.2f}%'.format(100 * sum(r['PERCENT_EXPLORED'] for r in results if r['RESULT'] == Solver.RESULT_CODE['WIN']) / wins))
-		print('Average time: {0:.2f}'.format(sum([r['TIME'] for r in results if r['RESULT'] == Solver.RESULT_CODE['WIN']]) / wins))
+	stats = ResultStats()
+	for d in data:
+		stats.add(ResultSink.makeRecord(d['solver']))
+	stats.printStats()
 
 # Recommended sleep time:
 # Expert - 0.1 seconds
-def solveMany(howMany, sleep=0.1, guess=False):
+# If sink is a file path, one record per game is appended to it (JSONL, or CSV for .csv paths)
+# as soon as the game finishes. Only running totals are kept in memory either way
+def solveMany(howMany, sleep=0.1, guess=False, sink=None):
 	solver = Solver(options={'GUESS': guess, 'PRINT_MODE': 'NOTHING'})
 	total = howMany
-	data = []
+	stats = ResultStats()
+	results = None if sink is None else ResultSink(sink)
 
-	for i in range(howMany):
-		try:
-			time.sleep(sleep)
+	try:
+		for i in range(howMany):
+			try:
+				time.sleep(sleep)
 
-			mygame, start_seed = start_game(silent=True, options={}, level='EXPERT', specs={})
-			solver.solve(mygame)
+				mygame, start_seed = start_game(silent=True, options={}, level='EXPERT', specs={})
+				solver.solve(mygame)
 
-			data.append({'solver': solver.getData(), 'game': mygame.getGameSolution()})
+				record = ResultSink.makeRecord(solver.getData(), mygame.getGameSolution()['SEED'], start_seed, i)
+				stats.add(record)
+				if results is not None:
+					results.write(record)
 
-			print('{}... Game seed: {}, Start seed: {}'.format(i, mygame.getGameSolution()['SEED'], start_seed))
+				print('{}... Game seed: {}, Start seed: {}'.format(i, record['GAME_SEED'], start_seed))
 
-			if solver.getData()['LOOP'][-1]['BOMBS_LEFT'] == 0 and solver.getData()['GAME']['RESULT'] != Solver.RESULT_CODE['WIN']:
+				if solver.getData()['LOOP'][-1]['BOMBS_LEFT'] == 0 and solver.getData()['GAME']['RESULT'] != Solver.RESULT_CODE['WIN']:
+					mygame.consoleDisplayVisible()
+			except KeyboardInterrupt as e:
+				break
+			except Exception as e:
 				mygame.consoleDisplayVisible()
+	finally:
+		if results is not None:
+			results.close()
+
+	stats.printStats()
+
+# Plays a single game for solveManyParallel. May run inside a worker process,
+# so it takes and returns only plain values that can be pickled
+# job: (index, game seed, start seed, level, guess)
+def solveJob(job):
+	index, gameSeed, startSeed, level, guess = job
+	solver = Solver(options={'GUESS': guess, 'PRINT_MODE': 'NOTHING', 'SEED': startSeed})
+	mygame, start_seed = start_game(silent=True, startSeed=startSeed, options={'SEED': gameSeed}, level=level, specs={})
+	solver.solve(mygame)
+
+	return ResultSink.makeRecord(solver.getData(), gameSeed, start_seed, index)
+
+# Same as solveMany, but spreads the games over a pool of worker processes
+# Every game gets its own (game seed, start seed) pair drawn from seed,
+# so the same seed plays the same games no matter how many workers there are
+# workers defaults to the number of CPUs
+# With threads=True the games are played on a thread pool in this process instead;
+# every game and solver has its own random stream, so the results are the same
+# Jobs are handed out a few at a time, so memory does not grow with howMany
+def solveManyParallel(howMany, workers=None, guess=False, level='EXPERT', seed=None, threads=False, sink=None):
+	seeder = random.Random(seed)
+	jobs = ((i, seeder.randrange(100000), seeder.randrange(100000), level, guess) for i in range(howMany))
+	stats = ResultStats()
+	results = None if sink is None else ResultSink(sink)
+
+	executor = concurrent.futures.ThreadPoolExecutor if threads else concurrent.futures.ProcessPoolExecutor
+	with executor(max_workers=workers) as pool:
+		inFlight = 4 * (workers if workers is not None else os.cpu_count() or 1)
+		futures = {}
+		try:
+			for job in jobs:
+				futures[pool.submit(solveJob, job)] = job
+				if len(futures) < inFlight:
+					continue
+
+				# Results come back in whatever order the games finish
+				done = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED).done
+				for future in done:
+					_collectJob(future, futures.pop(future), stats, results)
+
+			for future in concurrent.futures.as_completed(list(futures)):
+				_collectJob(future, futures.pop(future), stats, results)
 		except KeyboardInterrupt as e:
-			break
-		except Exception as e:
-			mygame.consoleDisplayVisible()
+			for future in futures:
+				future.cancel()
+		finally:
+			if results is not None:
+				results.close()
 
-	printStats(data)
+	stats.printStats()
+
+def _collectJob(future, job, stats, results):
+	try:
+		record = future.result()
+	except Exception as e:
+		print('{}... Game seed: {}, Start seed: {} failed: {}'.format(job[0], job[1], job[2], e))
+		return
+
+	stats.add(record)
+	if results is not None:
+		results.write(record)
+	print('{}... Game seed: {}, Start seed: {}'.format(record['INDEX'], record['GAME_SEED'], record['START_SEED']))
 
 def solveOne(guess=False, delay=0.25, seeds=(), level='EXPERT'):
-	solver = Solver(options={'GUESS': guess, 'DELAY': delay, 'PRINT_MODE': 'BOARD'})
+	renderer = ConsoleRenderer()
+	solver = Solver(options={'GUESS': guess, 'DELAY': delay, 'PRINT_MODE': 'BOARD', 'SEED': seeds[0] if len(seeds) == 2 else None, 'RENDERER': renderer})
 
 	if len(seeds) != 2:
 		mygame = start_game(silent=False, options={'DISPLAY_ON_MOVE': False, 'PRINT_GUIDES': True, 'PRINT_SEED': True}, level=level, specs={})[0]
@@ -122,14 +176,17 @@ def solveOne(guess=False, delay=0.25, seeds=(), level='EXPERT'):
 	try:
 		solver.solve(mygame)
 	except Exception as e:
+		renderer.close()
 		mygame.consoleDisplayVisible()
 		raise
+	renderer.close()
 
 	data = [{'solver': solver.getData(), 'game': mygame.getGameSolution()}]
 	printStats(data)
 
 if __name__=='__main__':
 	# solveMany(500, sleep=0.69, guess=False)
+	# solveManyParallel(500, workers=8, guess=False, seed=0)
 	# solveOne(guess=True, delay=1.21, level='EXPERT')
 
 	# Favorite one so far
@@ -0,0 +1,669 @@
+"""
+Basic usage:
+`python3 server.py serve --port 8765` # host games on localhost:8765
+`python3 server.py serve --unix /tmp/minesweeper.sock` # or on a Unix socket
+`python3 server.py load --sessions 200 --seconds 10` # load test a server started in the same process
+`python3 server.py load --port 8765 --sessions 200` # load test a running server
+
+From Python (inside a coroutine):
+`client = GameClient(options={'PORT': 8765})`
+`await client.connect()`
+`game = await client.new(level='EXPERT')`
+`reply = await client.open(game['SESSION'], 3, 4)`
+`await client.close()`
+
+Only the standard library and numpy are needed
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import time
+import numpy as np
+from factory import BoardFactory
+from game import Game
+
+"""
+Public members:
+
+OPS
+__init__(options=None)
+start() # coroutine
+serveForever() # coroutine
+close() # coroutine
+getAddress()
+getSessionCount()
+"""
+# Hosts many games at once, each one a session, for clients connected over TCP or a Unix socket
+#
+# The protocol is one JSON object per line in both directions. Every request has an 'OP',
+# and may have an 'ID', which is sent back in its reply. Replies come back in the order
+# of the requests on each connection, and have 'OK': true, or 'OK': false and an 'ERROR'
+#
+# Operations and their fields (replies in brackets):
+#   NEW: LEVEL, SPECS, SEED (all optional) [SESSION, HEIGHT, WIDTH, BOMBS, VERSION]
+#   OPEN, FLAG, UNFLAG, CHORD: SESSION, X, Y [RESULT, VERSION, BOMBS, CHANGES]
+#   VISIBLE: SESSION [BOARD, BOMBS, TIME, VERSION]
+#   DELTA: SESSION, VERSION [CHANGES, VERSION, BOMBS]
+#   CLOSE: SESSION
+# RESULT is true when the move won the game, false when it lost it, and null otherwise
+# CHANGES is a list of [x, y, code] as in Game.getChangesSince
+#
+# A NEW game with a SEED is made by Game.populateBoard, so the same seed always gives the same
+# board. Without one, the board comes from a batch made ahead by BoardFactory, which is
+# much faster (its bombs stay clear of some random cell, see BoardFactory.makeContents)
+# Boards with more than MAX_CELLS cells are refused
+#
+# Every connection is read in chunks, and all the requests in a chunk are run and
+# their replies sent back with one write. The next chunk is only read once those replies
+# have been taken by the connection (see asyncio.StreamWriter.drain), so a client
+# that stops reading its replies stops being read from as well
+# The sessions made on a connection are closed when it closes
+class GameServer:
+	OPS = ['NEW', 'OPEN', 'FLAG', 'UNFLAG', 'CHORD', 'VISIBLE', 'DELTA', 'CLOSE']
+
+	# options
+	__HOST = '127.0.0.1'
+	# 0 lets the system pick a free port, see getAddress
+	__PORT = 0
+	# Path of a Unix socket to use instead of TCP
+	__PATH = None
+	__MAX_SESSIONS = 10000
+	# Most cells on the board of a NEW game
+	__MAX_CELLS = 100 * 100
+	# Longest request line, in bytes
+	__LINE_LIMIT = 64 * 1024
+	__READ_SIZE = 64 * 1024
+	# Number of boards made at once by BoardFactory, fewer for big boards
+	# so that a batch never has more than BATCH_CELLS cells in all
+	__BATCH = 256
+	__BATCH_CELLS = 256 * 16 * 30
+
+	__SERVER = None
+	__SESSIONS = None
+	__NEXT_SESSION = 1
+	__HANDLERS = None
+	# The task and the writer serving each open connection
+	__CONNECTIONS = None
+	__FACTORY = None
+	# Boards made ahead for NEW games without a seed, by (height, width, bombs)
+	# Only the most recently used sizes are kept around
+	__BOARDS = None
+	__BOARDS_SIZE = 8
+
+	def __init__(self, options=None):
+		if options is not None:
+			if 'HOST' in options:
+				self.__HOST = options['HOST']
+			if 'PORT' in options:
+				self.__PORT = options['PORT']
+			if 'PATH' in options:
+				self.__PATH = options['PATH']
+			if 'MAX_SESSIONS' in options:
+				self.__MAX_SESSIONS = options['MAX_SESSIONS']
+			if 'MAX_CELLS' in options:
+				self.__MAX_CELLS = options['MAX_CELLS']
+			if 'LINE_LIMIT' in options:
+				self.__LINE_LIMIT = options['LINE_LIMIT']
+			if 'BATCH' in options:
+				self.__BATCH = options['BATCH']
+			if 'BATCH_CELLS' in options:
+				self.__BATCH_CELLS = options['BATCH_CELLS']
+
+		self.__SESSIONS = {}
+		self.__CONNECTIONS = {}
+		self.__FACTORY = BoardFactory()
+		self.__BOARDS = collections.OrderedDict()
+		self.__HANDLERS = {
+			'NEW': self.__new,
+			'OPEN': self.__move,
+			'FLAG': self.__move,
+			'UNFLAG': self.__move,
+			'CHORD': self.__move,
+			'VISIBLE': self.__visible,
+			'DELTA': self.__delta,
+			'CLOSE': self.__close,
+		}
+
+	async def start(self):
+		if self.__PATH is None:
+			self.__SERVER = await asyncio.start_server(self.__serve, self.__HOST, self.__PORT)
+		else:
+			self.__SERVER = await asyncio.start_unix_server(self.__serve, self.__PATH)
+		return self.getAddress()
+
+	async def serveForever(self):
+		if self.__SERVER is None:
+			await self.start()
+		try:
+			await self.__SERVER.serve_forever()
+		finally:
+			await self.close()
+
+	async def close(self):
+		if self.__SERVER is not None:
+			self.__SERVER.close()
+			# Dropping a connection (along with any replies it has not taken yet)
+			# makes the task serving it finish
+			tasks = list(self.__CONNECTIONS)
+			for writer in self.__CONNECTIONS.values():
+				writer.transport.abort()
+			await asyncio.gather(*tasks, return_exceptions=True)
+			await self.__SERVER.wait_closed()
+			self.__SERVER = None
+			if self.__PATH is not None and os.path.exists(self.__PATH):
+				os.remove(self.__PATH)
+
+	# Returns (host, port) for TCP, or the path of the Unix socket
+	def getAddress(self):
+		if self.__PATH is not None:
+			return self.__PATH
+		if self.__SERVER is None:
+			return (self.__HOST, self.__PORT)
+		return self.__SERVER.sockets[0].getsockname()[:2]
+
+	def getSessionCount(self):
+		return len(self.__SESSIONS)
+
+	async def __serve(self, reader, writer):
+		self.__CONNECTIONS[asyncio.current_task()] = writer
+		owned = set()
+		# The start of a request whose end has not been read yet
+		partial = b''
+		try:
+			while True:
+				data = await reader.read(self.__READ_SIZE)
+				if len(data) == 0:
+					break
+				lines = (partial + data).split(b'\n')
+				partial = lines.pop()
+
+				replies = [self.__encode(self.__handle(line, owned)) for line in lines if line.strip() != b'']
+				if len(partial) > self.__LINE_LIMIT:
+					# The rest of the stream can not be trusted
+					replies.append(self.__encode({'OK': False, 'ERROR': 'Request longer than {} bytes'.format(self.__LINE_LIMIT)}))
+				if len(replies) > 0:
+					writer.write(b''.join(replies))
+					await writer.drain()
+				if len(partial) > self.__LINE_LIMIT:
+					break
+		except ConnectionError:
+			pass
+		finally:
+			for session in owned:
+				self.__SESSIONS.pop(session, None)
+			del self.__CONNECTIONS[asyncio.current_task()]
+			writer.close()
+
+	def __encode(self, reply):
+		return json.dumps(reply, separators=(',', ':')).encode() + b'\n'
+
+	# Runs one request line and returns its reply
+	def __handle(self, line, owned):
+		request = None
+		try:
+			request = json.loads(line)
+			if type(request) != dict:
+				raise ValueError('Request must be a JSON object')
+			if request.get('OP') not in self.__HANDLERS:
+				raise ValueError('Unknown operation {}. Please choose one of {}'.format(request.get('OP'), ', '.join(self.OPS)))
+			reply = self.__HANDLERS[request['OP']](request, owned)
+			reply['OK'] = True
+		except Exception as e:
+			reply = {'OK': False, 'ERROR': str(e) if str(e) != '' else type(e).__name__}
+
+		if type(request) == dict and 'ID' in request:
+			reply['ID'] = request['ID']
+		return reply
+
+	def __getSession(self, request):
+		session = request.get('SESSION')
+		if session not in self.__SESSIONS:
+			raise ValueError('Unknown session {}'.format(session))
+		return self.__SESSIONS[session]
+
+	def __getInt(self, request, key):
+		value = request.get(key)
+		if type(value) != int:
+			raise ValueError('{} must be an integer'.format(key))
+		return value
+
+	def __new(self, request, owned):
+		if len(self.__SESSIONS) >= self.__MAX_SESSIONS:
+			raise ValueError('Too many sessions, the server holds at most {}'.format(self.__MAX_SESSIONS))
+
+		level = request.get('LEVEL', 'BEGINNER')
+		specs = request.get('SPECS', {})
+		if type(specs) != dict:
+			raise ValueError('SPECS must be an object')
+		h, w, b = self.__FACTORY.getSize(level, specs)
+		if h * w > self.__MAX_CELLS:
+			raise ValueError('Board of size {}x{} is too big, the server makes boards of at most {} cells'.format(h, w, self.__MAX_CELLS))
+		game = Game(options={'SILENT': True, 'SEED': request.get('SEED')})
+		board = None if request.get('SEED') is not None else self.__nextBoard(level, specs)
+		if board is None:
+			game.populateBoard(level=level, specs=specs)
+		else:
+			game.loadBoard(board)
+
+		session = self.__NEXT_SESSION
+		self.__NEXT_SESSION = self.__NEXT_SESSION + 1
+		self.__SESSIONS[session] = game
+		owned.add(session)
+		return {
+			'SESSION': session,
+			'HEIGHT': game.getBoardHeight(),
+			'WIDTH': game.getBoardWidth(),
+			'BOMBS': game.getTotalBombs(),
+			'VERSION': game.getVersion(),
+		}
+
+	# Returns the next board made ahead for the given level and specs, or None
+	# if BoardFactory can not make them (too many bombs to keep clear of a cell)
+	def __nextBoard(self, level, specs):
+		size = self.__FACTORY.getSize(level, specs)
+		boards = self.__BOARDS.get(size)
+		if boards is None or len(boards) == 0:
+			try:
+				batch = max(1, min(self.__BATCH, self.__BATCH_CELLS // (size[0] * size[1])))
+				boards = list(self.__FACTORY.makeContents(batch, level, specs)[0])
+			except ValueError:
+				return None
+			self.__BOARDS[size] = boards
+		self.__BOARDS.move_to_end(size)
+		while len(self.__BOARDS) > self.__BOARDS_SIZE:
+			self.__BOARDS.popitem(last=False)
+		return boards.pop()
+
+	def __move(self, request, owned):
+		game = self.__getSession(request)
+		x = self.__getInt(request, 'X')
+		y = self.__getInt(request, 'Y')
+		move = {'OPEN': game.open, 'FLAG': game.flag, 'UNFLAG': game.unflag, 'CHORD': game.chord}[request['OP']]
+		result, changes = move(x, y, changes=True)
+		return {
+			'RESULT': result,
+			'VERSION': game.getVersion(),
+			'BOMBS': game.getBombsLeft(),
+			'CHANGES': changes,
+		}
+
+	def __visible(self, request, owned):
+		game = self.__getSession(request)
+		visible = game.getGameVisible()
+		visible['VERSION'] = game.getVersion()
+		return visible
+
+	def __delta(self, request, owned):
+		game = self.__getSession(request)
+		return {
+			'CHANGES': game.getChangesSince(self.__getInt(request, 'VERSION')),
+			'VERSION': game.getVersion(),
+			'BOMBS': game.getBombsLeft(),
+		}
+
+	def __close(self, request, owned):
+		self.__getSession(request)
+		del self.__SESSIONS[request['SESSION']]
+		owned.discard(request['SESSION'])
+		return {}
+
+"""
+Public members:
+
+__init__(options=None)
+connect() # coroutine
+close() # coroutine
+request(op, **fields) # coroutine
+new(level='BEGINNER', specs={}, seed=None) # coroutine
+open(session, x, y) # coroutine
+flag(session, x, y) # coroutine
+unflag(session, x, y) # coroutine
+chord(session, x, y) # coroutine
+visible(session) # coroutine
+delta(session, version) # coroutine
+closeSession(session) # coroutine
+"""
+# Talks to a GameServer over one connection. Requests from any number of tasks
+# are sent without waiting for the replies to the ones before (pipelined),
+# and matched to their replies by 'ID'. The requests made in the same pass of the
+# event loop are sent with one write, by a task that then waits for the connection
+# to take them (see asyncio.StreamWriter.drain) before those requests go on waiting
+# for their replies, so a server that stops reading slows the client down
+# At most MAX_IN_FLIGHT requests wait for a reply at once: beyond that, request
+# waits until an earlier one is answered. Failed requests raise ValueError
+class GameClient:
+	# options
+	__HOST = '127.0.0.1'
+	__PORT = None
+	__PATH = None
+	__MAX_IN_FLIGHT = 64
+	__READ_SIZE = 64 * 1024
+
+	__READER = None
+	__WRITER = None
+	__READ_TASK = None
+	# Futures of the requests waiting for a reply, by ID
+	__PENDING = None
+	# Requests not sent yet, the task that will send them,
+	# and the last task that sent some (which may still be waiting for the connection)
+	__OUTBOX = None
+	__FLUSH = None
+	__SENT = None
+	__SLOTS = None
+	__NEXT_ID = 1
+
+	def __init__(self, options=None):
+		if options is not None:
+			if 'HOST' in options:
+				self.__HOST = options['HOST']
+			if 'PORT' in options:
+				self.__PORT = options['PORT']
+			if 'PATH' in options:
+				self.__PATH = options['PATH']
+			if 'MAX_IN_FLIGHT' in options:
+				self.__MAX_IN_FLIGHT = options['MAX_IN_FLIGHT']
+
+		self.__PENDING = {}
+		self.__OUTBOX = []
+
+	async def connect(self):
+		if self.__PATH is not None:
+			self.__READER, self.__WRITER = await asyncio.open_unix_connection(self.__PATH)
+		elif self.__PORT is not None:
+			self.__READER, self.__WRITER = await asyncio.open_connection(self.__HOST, self.__PORT)
+		else:
+			raise ValueError('A client needs the PORT or the PATH option')
+
+		self.__SLOTS = asyncio.Semaphore(self.__MAX_IN_FLIGHT)
+		self.__READ_TASK = asyncio.create_task(self.__read())
+		return self
+
+	async def __aenter__(self):
+		return await self.connect()
+
+	async def __aexit__(self, *args):
+		await self.close()
+
+	async def close(self):
+		if self.__WRITER is not None:
+			self.__WRITER.close()
+			try:
+				await self.__WRITER.wait_closed()
+			except ConnectionError:
+				pass
+			self.__WRITER = None
+		if self.__READ_TASK is not None:
+			self.__READ_TASK.cancel()
+			self.__READ_TASK = None
+
+	# Hands every reply to the request waiting for it
+	async def __read(self):
+		error = ConnectionError('Connection to the server closed')
+		partial = b''
+		try:
+			while True:
+				data = await self.__READER.read(self.__READ_SIZE)
+				if len(data) == 0:
+					break
+				lines = (partial + data).split(b'\n')
+				partial = lines.pop()
+				for line in lines:
+					reply = json.loads(line)
+					future = self.__PENDING.pop(reply.get('ID'), None)
+					if future is not None and not future.done():
+						future.set_result(reply)
+		except (ConnectionError, ValueError) as e:
+			error = ConnectionError('Connection to the server failed: {}'.format(e))
+		finally:
+			for future in self.__PENDING.values():
+				if not future.done():
+					future.set_exception(error)
+			self.__PENDING.clear()
+
+	# Sends one request and returns its reply (without 'ID' and 'OK')
+	async def request(self, op, **fields):
+		if self.__WRITER is None:
+			raise ConnectionError('Not connected, call connect first')
+		if self.__READ_TASK.done():
+			raise ConnectionError('Connection to the server closed')
+
+		async with self.__SLOTS:
+			requestId = self.__NEXT_ID
+			self.__NEXT_ID = self.__NEXT_ID + 1
+			future = asyncio.get_running_loop().create_future()
+			self.__PENDING[requestId] = future
+
+			fields['ID'] = requestId
+			fields['OP'] = op
+			self.__OUTBOX.append(json.dumps(fields, separators=(',', ':')).encode() + b'\n')
+			if self.__FLUSH is None:
+				self.__FLUSH = asyncio.create_task(self.__flush(self.__SENT))
+				self.__SENT = self.__FLUSH
+			try:
+				# Shielded so that a cancelled request does not stop the others from being sent
+				await asyncio.shield(self.__FLUSH)
+				reply = await future
+			finally:
+				# A cancelled request no longer waits for its reply
+				self.__PENDING.pop(requestId, None)
+
+		if not reply.pop('OK'):
+			raise ValueError(reply['ERROR'])
+		del reply['ID']
+		return reply
+
+	# Sends the requests in the outbox with one write and waits until the connection takes them
+	# Nothing is written before the connection has taken what the previous task sent,
+	# and requests made in the meantime join the outbox
+	async def __flush(self, previous):
+		if previous is not None:
+			await asyncio.wait([previous])
+		writer = self.__WRITER
+		outbox = self.__OUTBOX
+		self.__OUTBOX = []
+		self.__FLUSH = None
+		if writer is not None and len(outbox) > 0:
+			writer.write(b''.join(outbox))
+			try:
+				await writer.drain()
+			except ConnectionError:
+				# The requests fail with the connection, when __read finds it closed
+				pass
+
+	async def new(self, level='BEGINNER', specs={}, seed=None):
+		return await self.request('NEW', LEVEL=level, SPECS=specs, SEED=seed)
+
+	async def open(self, session, x, y):
+		return await self.request('OPEN', SESSION=session, X=x, Y=y)
+
+	async def flag(self, session, x, y):
+		return await self.request('FLAG', SESSION=session, X=x, Y=y)
+
+	async def unflag(self, session, x, y):
+		return await self.request('UNFLAG', SESSION=session, X=x, Y=y)
+
+	async def chord(self, session, x, y):
+		return await self.request('CHORD', SESSION=session, X=x, Y=y)
+
+	async def visible(self, session):
+		return await self.request('VISIBLE', SESSION=session)
+
+	async def delta(self, session, version):
+		return await self.request('DELTA', SESSION=session, VERSION=version)
+
+	async def closeSession(self, session):
+		return await self.request('CLOSE', SESSION=session)
+
+"""
+Public members:
+
+__init__(options=None)
+run() # coroutine
+printStats()
+"""
+# Plays many games at once against a GameServer and measures how fast it answers
+# Every session is a task that plays one game after another, opening covered cells
+# at random (from its own seeded random stream) until the game ends. The sessions
+# share CONNECTIONS clients. Without a PORT or a PATH, a server is started in this process
+class LoadGenerator:
+	# options
+	__HOST = '127.0.0.1'
+	__PORT = None
+	__PATH = None
+	__SESSIONS = 100
+	__CONNECTIONS = 4
+	__SECONDS = 10
+	__LEVEL = 'BEGINNER'
+	__SEED = 0
+	__MAX_IN_FLIGHT = 64
+
+	__STATS = None
+
+	def __init__(self, options=None):
+		if options is not None:
+			if 'HOST' in options:
+				self.__HOST = options['HOST']
+			if 'PORT' in options:
+				self.__PORT = options['PORT']
+			if 'PATH' in options:
+				self.__PATH = options['PATH']
+			if 'SESSIONS' in options:
+				self.__SESSIONS = options['SESSIONS']
+			if 'CONNECTIONS' in options:
+				self.__CONNECTIONS = options['CONNECTIONS']
+			if 'SECONDS' in options:
+				self.__SECONDS = options['SECONDS']
+			if 'LEVEL' in options:
+				self.__LEVEL = options['LEVEL']
+			if 'SEED' in options:
+				self.__SEED = options['SEED']
+			if 'MAX_IN_FLIGHT' in options:
+				self.__MAX_IN_FLIGHT = options['MAX_IN_FLIGHT']
+
+	# Runs the load for SECONDS seconds and returns its stats
+	async def run(self):
+		server = None
+		host, port, path = self.__HOST, self.__PORT, self.__PATH
+		if port is None and path is None:
+			server = GameServer(options={'HOST': host, 'MAX_SESSIONS': self.__SESSIONS * 2})
+			host, port = await server.start()
+
+		clients = [GameClient(options={'HOST': host, 'PORT': port, 'PATH': path, 'MAX_IN_FLIGHT': self.__MAX_IN_FLIGHT})
+			for i in range(self.__CONNECTIONS)]
+		try:
+			for client in clients:
+				await client.connect()
+
+			start = time.perf_counter()
+			deadline = start + self.__SECONDS
+			sessions = await asyncio.gather(*[self.__play(clients[i % len(clients)], self.__SEED + i, deadline)
+				for i in range(self.__SESSIONS)])
+			elapsed = time.perf_counter() - start
+		finally:
+			for client in clients:
+				await client.close()
+			if server is not None:
+				await server.close()
+
+		latencies = np.concatenate([s['LATENCIES'] for s in sessions])
+		moves = len(latencies)
+		self.__STATS = {
+			'SESSIONS': self.__SESSIONS,
+			'CONNECTIONS': self.__CONNECTIONS,
+			'SECONDS': elapsed,
+			'MOVES': moves,
+			'GAMES': sum(s['GAMES'] for s in sessions),
+			'WON': sum(s['WON'] for s in sessions),
+			'MOVES_PER_SECOND': moves / elapsed,
+			'LATENCY_MEDIAN': float(np.median(latencies)) if moves > 0 else 0.0,
+			'LATENCY_P99': float(np.percentile(latencies, 99)) if moves > 0 else 0.0,
+		}
+		return self.__STATS
+
+	# Plays games in one session until the deadline and returns how it went
+	async def __play(self, client, seed, deadline):
+		rng = random.Random(seed)
+		latencies = []
+		games = 0
+		won = 0
+
+		while time.perf_counter() < deadline:
+			game = await client.new(level=self.__LEVEL)
+			games = games + 1
+			covered = [(x, y) for x in range(game['HEIGHT']) for y in range(game['WIDTH'])]
+			index = {c: i for i, c in enumerate(covered)}
+
+			result = None
+			while result is None and len(covered) > 0 and time.perf_counter() < deadline:
+				x, y = covered[rng.randrange(len(covered))]
+				start = time.perf_counter()
+				reply = await client.open(game['SESSION'], x, y)
+				latencies.append(time.perf_counter() - start)
+				result = reply['RESULT']
+
+				# Take the opened cells out of the covered ones (swapping with the last one)
+				for cx, cy, code in reply['CHANGES']:
+					i = index.pop((cx, cy), None)
+					if i is not None:
+						last = covered.pop()
+						if i < len(covered):
+							covered[i] = last
+							index[last] = i
+
+			if result == True:
+				won = won + 1
+			await client.closeSession(game['SESSION'])
+
+		return {'LATENCIES': np.array(latencies), 'GAMES': games, 'WON': won}
+
+	def printStats(self):
+		if self.__STATS is None:
+			print('No data collected')
+			return
+
+		stats = self.__STATS
+		print('')
+		print('Sessions: {} over {} connections'.format(stats['SESSIONS'], stats['CONNECTIONS']))
+		print('Moves: {0} in {1:.2f} s ({2:.0f} per second)'.format(stats['MOVES'], stats['SECONDS'], stats['MOVES_PER_SECOND']))
+		print('Games: {} ({} won)'.format(stats['GAMES'], stats['WON']))
+		print('Latency: {0:.2f} ms median, {1:.2f} ms 99th percentile'.format(1000 * stats['LATENCY_MEDIAN'], 1000 * stats['LATENCY_P99']))
+
+if __name__=='__main__':
+	parser = argparse.ArgumentParser(description='Hosts Minesweeper games over TCP or a Unix socket, or load tests such a server.')
+	parser.add_argument('command', choices=['serve', 'load'])
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, help='TCP port (serve defaults to 8765, load starts its own server without one)')
+	parser.add_argument('--unix', help='path of a Unix socket to use instead of TCP')
+	parser.add_argument('--sessions', type=int, default=100, help='load: number of games played at once')
+	parser.add_argument('--connections', type=int, default=4, help='load: number of connections the sessions share')
+	parser.add_argument('--seconds', type=float, default=10, help='load: how long to run for')
+	parser.add_argument('--level', default='BEGINNER', help='load: level of the games played')
+	parser.add_argument('--seed', type=int, default=0, help='load: seed of the first session')
+	args = parser.parse_args()
+
+	if args.command == 'serve':
+		server = GameServer(options={'HOST': args.host, 'PORT': 8765 if args.port is None else args.port, 'PATH': args.unix})
+		async def serve():
+			print('Serving on {}'.format(await server.start()))
+			await server.serveForever()
+		try:
+			asyncio.run(serve())
+		except KeyboardInterrupt:
+			pass
+	else:
+		generator = LoadGenerator(options={
+			'HOST': args.host,
+			'PORT': args.port,
+			'PATH': args.unix,
+			'SESSIONS': args.sessions,
+			'CONNECTIONS': args.connections,
+			'SECONDS': args.seconds,
+			'LEVEL': args.level,
+			'SEED': args.seed,
+		})
+		asyncio.run(generator.run())
+		generator.printStats()